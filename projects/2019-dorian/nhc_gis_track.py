@@ -25,20 +25,25 @@ Notes
                               'SS', 'LAT', 'LON']
 
 """
-import cartopy.io.shapereader as shpreader
+import shapefile
 import cartopy.feature as cfeature
 import matplotlib as mpl
 import matplotlib.pyplot as plt
 import cartopy.crs as ccrs
 from os.path import join
 import numpy as np
-import datetime
 import pandas as pd
 from os.path import isfile
+from functools import lru_cache
 import time
+import re
 
 from sys import exit
 
+# Frequency strings accepted by interp_track_df: an optional integer multiple
+# followed by a pandas offset alias. Ex: 'T', '1T', '10T', '30min', '1H'
+_FREQ_RE = re.compile(r'^(\d*)(H|T|min|S|L|ms|D|W)$')
+
 
 
 ################################################################################
@@ -67,44 +72,28 @@ def get_track_meta(shp_path):
     """
     meta = {}
 
-    shp_reader = shpreader.Reader(shp_path)
-    first_rec = next(shp_reader.records())
-
-    # Get the date & time of the first record
-    first_dt = '{}{}{}-{}'.format(first_rec.attributes['MONTH'], first_rec.attributes['DAY'],
-                                  first_rec.attributes['YEAR'], first_rec.attributes['HHMM'])
-
-    first_dt = datetime.datetime.strptime(first_dt, "%m%d%Y-%H%M")
-    first_dt = datetime.datetime.strftime(first_dt, "%m-%d-%Y-%H:%Mz")
-
-    max_ss = 0
-    max_wind = 0
-    num_records = 0
-
-    for rec in shp_reader.records():
-        num_records += 1
-        storm_name = rec.attributes['STORMNAME']
-        storm_basin = rec.attributes['BASIN']
-        storm_num = rec.attributes['STORMNUM']
-
-        # Update maximum Saffir-Simpson rating if necessary
-        curr_ss = rec.attributes['SS']
-        if (curr_ss > max_ss):
-            max_ss = curr_ss
-
-        # Update maximum storm intensity if necessary
-        curr_wind = rec.attributes['INTENSITY']
-        if (curr_wind > max_wind):
-            max_wind = curr_wind
-
-        last_dt = '{}{}{}-{}'.format(rec.attributes['MONTH'], rec.attributes['DAY'],
-                                     rec.attributes['YEAR'], rec.attributes['HHMM'])
-
-    last_dt = datetime.datetime.strptime(last_dt, "%m%d%Y-%H%M")
-    last_dt = datetime.datetime.strftime(last_dt, "%m-%d-%Y-%H:%Mz")
-
-    year = rec.attributes['YEAR']
-    storm_num = str(storm_num).zfill(2)
+    # The attribute table is read in one bulk call, the geometries aren't needed
+    attrs = _read_attributes(shp_path, ['MONTH', 'DAY', 'YEAR', 'HHMM', 'STORMNAME',
+                                        'BASIN', 'STORMNUM', 'SS', 'INTENSITY'])
+    last_rec = attrs.iloc[-1]
+
+    # Get the date & time of the first & last records. The date-time strings
+    # are fixed-width 'MM-DD-YYYY-HHMM', so they are reformatted by slicing
+    # rather than parsed
+    first_dtg, last_dtg = _dtg_strings(attrs.iloc[[0, -1]])
+    first_dt = _fmt_dtg(first_dtg)
+    last_dt = _fmt_dtg(last_dtg)
+
+    # Maximum Saffir-Simpson rating & storm intensity over the whole track
+    maxes = attrs.agg({'SS': 'max', 'INTENSITY': 'max'})
+    max_ss = int(maxes['SS'])
+    max_wind = int(maxes['INTENSITY'])
+    num_records = len(attrs)
+
+    storm_name = last_rec['STORMNAME']
+    storm_basin = last_rec['BASIN']
+    year = int(last_rec['YEAR'])
+    storm_num = str(last_rec['STORMNUM']).zfill(2)
 
     storm_id = '{}{}{}'.format(storm_basin.upper(), storm_num, year)
 
@@ -123,18 +112,120 @@ def get_track_meta(shp_path):
 
 
 
+def _read_attributes(shp_path, fields):
+    """
+    Reads the attribute table of a shapefile into a DataFrame. The table is
+    read from the .dbf in one call, without decoding any of the geometries
+
+    Parameters
+    ----------
+    shp_path : str
+        Absolute path, including the filename, of the shapefile to open & read
+    fields : list of str
+        Attributes to return
+
+    Returns
+    -------
+    pandas DataFrame
+    """
+    shp_file = shapefile.Reader(shp_path)
+    try:
+        try:
+            # pyshp >= 2.2 can skip decoding the fields that aren't needed. The
+            # requested fields are returned in the order they're stored in
+            records = shp_file.records(fields=fields)
+            field_names = list(records[0].as_dict()) if records else fields
+        except TypeError:
+            # The first field is pyshp's DeletionFlag, which has no column
+            records = shp_file.records()
+            field_names = [field[0] for field in shp_file.fields[1:]]
+
+        attrs = pd.DataFrame(records, columns=field_names)
+    finally:
+        shp_file.close()
+
+    return attrs[fields]
+
+
+
+def _read_points(shp_path):
+    """
+    Reads the coordinates of every point in a point shapefile into an array, in
+    a single pass over the shapes
+
+    Parameters
+    ----------
+    shp_path : str
+        Absolute path, including the filename, of the shapefile to open & read
+
+    Returns
+    -------
+    numpy 2d array of float
+        Shape: (num_records, 2), columns: (lon, lat)
+    """
+    shp_file = shapefile.Reader(shp_path)
+    try:
+        coords = np.array([shape.points[0] for shape in shp_file.iterShapes()],
+                          dtype=np.float64)
+    finally:
+        shp_file.close()
+
+    return coords.reshape(-1, 2)
+
+
+
+def _dtg_strings(attrs):
+    """
+    Builds the date-time string of each best track record from its MONTH, DAY,
+    YEAR, & HHMM attributes, as whole-column string operations
+
+    Parameters
+    ----------
+    attrs : pandas DataFrame
+        Best track attribute table
+
+    Returns
+    -------
+    pandas Series of str
+        Format: MM-DD-YYYY-HHMM
+    """
+    month = attrs['MONTH'].astype(str).str.zfill(2)
+    day = attrs['DAY'].astype(str).str.zfill(2)
+    hhmm = attrs['HHMM'].astype(str).str.zfill(4)
+
+    return month.str.cat([day, attrs['YEAR'].astype(str), hhmm], sep='-')
+
+
+
+def _fmt_dtg(dtg):
+    """
+    Formats a best track date-time string for the metadata dict
+
+    Parameters
+    ----------
+    dtg : str
+        Format: MM-DD-YYYY-HHMM
+
+    Returns
+    -------
+    str
+        Format: MM-DD-YYYY-HH:MMz
+    """
+    return '{}:{}z'.format(dtg[:13], dtg[13:])
+
+
+
 def pp_meta(meta_dict):
     """
-    Pretty print func for meta dict
+    Pretty print func for meta dict. The lines are joined & printed at once
     """
     # Determine the length of the longest key
-    keys = list(meta_dict.keys())
-    max_len = len(max(keys, key=len))
+    max_len = max(map(len, meta_dict))
 
-    for key, val in meta_dict.items():
-        # Print the key with appended spaces to the end to make it the same
-        # length as the longest key
-        print('{} --> {}'.format(key.ljust(max_len), val))
+    # Each key is padded with spaces to make it the same length as the
+    # longest key
+    print('\n'.join('{} --> {}'.format(key.ljust(max_len), val)
+                    for key, val in meta_dict.items()))
 
 
 
@@ -161,46 +252,20 @@ def track_shp_to_df(shp_path, outpath=None, write=False):
     """
     col_names = ['date-time', 'name', 'storm_num', 'basin', 'lat',
                  'lon', 'mslp', 'storm_type', 'wind', 'ss']
-    data = []
-
-    shp_reader = shpreader.Reader(shp_path)
-
-    track_pts = list(shp_reader.geometries())
-    lons = [pt.x for pt in track_pts]
-    lats = [pt.y for pt in track_pts]
-
-    for rec in shp_reader.records():
-        dt = '{}-{}-{}-{}'.format(
-                                str(rec.attributes['MONTH']).zfill(2),
-                                str(rec.attributes['DAY']).zfill(2),
-                                rec.attributes['YEAR'],
-                                rec.attributes['HHMM']
-                                )
-        lon = rec.geometry.x
-        lat = rec.geometry.y
-        name = rec.attributes['STORMNAME']
-        storm_num = rec.attributes['STORMNUM']
-        basin = rec.attributes['BASIN']
-        mslp = rec.attributes['MSLP']
-        storm_type = rec.attributes['STORMTYPE']
-        wind = rec.attributes['INTENSITY']
-        ss = rec.attributes['SS']
-
-        curr_dict = {'date-time': dt,
-                    'name': name,
-                    'storm_num': storm_num,
-                    'basin': basin,
-                    'lon': lon,
-                    'lat': lat,
-                    'storm_type': storm_type,
-                    'mslp': mslp,
-                    'wind': wind,
-                    'ss': ss
-                    }
-
-        data.append(curr_dict)
-
-    df = pd.DataFrame(data, columns=col_names)
+    track_pts = _read_points(shp_path)
+
+    attrs = _read_attributes(shp_path, ['MONTH', 'DAY', 'YEAR', 'HHMM', 'STORMNAME',
+                                        'STORMNUM', 'BASIN', 'MSLP', 'STORMTYPE',
+                                        'INTENSITY', 'SS'])
+
+    df = attrs.rename(columns={'STORMNAME': 'name', 'STORMNUM': 'storm_num',
+                               'BASIN': 'basin', 'MSLP': 'mslp',
+                               'STORMTYPE': 'storm_type', 'INTENSITY': 'wind',
+                               'SS': 'ss'})
+    df['date-time'] = _dtg_strings(attrs)
+    df['lon'] = track_pts[:, 0]
+    df['lat'] = track_pts[:, 1]
+    df = df[col_names]
     df = df.set_index('date-time')
 
     if (write):
@@ -222,14 +287,14 @@ def track_csv_to_df(abs_path):
     Returns
     -------
     df : Pandas DataFrame
-        DataFrame containing the best track data
-        Column names: ['date-time', 'name', 'storm_num', 'basin', 'lat',
-                       'lon', 'mslp', 'storm_type', 'wind', 'ss']
+        DataFrame containing the best track data, indexed by 'date-time'
+        Column names: ['name', 'storm_num', 'basin', 'lat', 'lon', 'mslp',
+                       'storm_type', 'wind', 'ss']
 
         or
 
-        col_names = ['date-time', 'storm_num', 'lat', 'lon', 'mslp', 'wind', 'ss']
-        if reading an interpolated data file
+        Column names: ['storm_num', 'lat', 'lon', 'mslp', 'wind', 'ss']
+        if reading a data file written from interp_track_df's output
     """
     if (isfile(abs_path)):
         df = pd.read_csv(abs_path, sep=',', header=0, index_col='date-time')
@@ -263,10 +328,12 @@ def track_df_to_csv(df, outpath):
 def pp_df(df):
     from time import sleep
 
-    for index, row in df.iterrows():
-        # ['storm_num', 'lat', 'lon', 'mslp', 'wind', 'ss']
+    # Plain tuples rather than a Series per row
+    rows = df[['lat', 'lon', 'mslp', 'wind']].itertuples(index=True, name=None)
+
+    for index, lat, lon, mslp, wind in rows:
         print('{0}   {1:.3f}   {2:.3f}   {3:.3f}   {4:.3f}'.format(index,
-                row['lat'], row['lon'], row['mslp'], row['wind']))
+                lat, lon, mslp, wind))
         sleep(0.1)
 
 
@@ -275,6 +342,31 @@ def pp_df(df):
 ################################################################################
 
 
+@lru_cache(maxsize=None)
+def _ne_feature(category, name, scale):
+    """
+    Returns the Natural Earth feature for the given category, name, & scale.
+    Cached so repeated plots reuse the same feature object, & with it the
+    geometries cartopy has already read from the Natural Earth shapefile
+
+    Parameters
+    ----------
+    category : str
+        Ex: 'physical', 'cultural'
+    name : str
+        Ex: 'land', 'admin_0_countries', 'admin_1_states_provinces'
+    scale : str
+        Ex: '110m', '50m', '10m'
+
+    Returns
+    -------
+    cartopy NaturalEarthFeature
+    """
+    return cfeature.NaturalEarthFeature(category=category, name=name, scale=scale,
+                                        facecolor='none')
+
+
+
 def interp_track_df(df, freq):
     """
     Interpolate the dataframe to 1-minute
@@ -306,48 +398,31 @@ def interp_track_df(df, freq):
         Dataframe containing interpolated data.
         Column names: ['storm_num', 'lat', 'lon', 'mslp', 'wind', 'ss']
     """
-    valid_freqs = ['H', 'T', 'min', 'S', 'L', 'ms', 'D', 'W']
-
-    # Validate the frequency string
-    if (len(freq) > 1):
-        # If there is a number attached to the frequency alias
-        key = freq[1]
-        val = freq[0]
-
-        try:
-            val = int(val)
-        except ValueError:
-            raise ValueError('Invalid frequency argument')
-
-    # Validate the frequency alias. Works regardless of if a leading number
-    # is attached or not
-    if (not freq[-1] in valid_freqs):
+    # Validate the frequency string: an optional multiple followed by one of
+    # the supported offset aliases
+    if (not _FREQ_RE.match(freq)):
         raise ValueError('Invalid frequency argument')
 
 
-    start_dt = df.index[0]
-    start_dt = datetime.datetime.strptime(start_dt, '%m-%d-%Y-%H%M')
-
-    end_dt = df.index[-1]
-    end_dt = datetime.datetime.strptime(end_dt, '%m-%d-%Y-%H%M')
-
     # Convert the index type from str to pandas timestamp
-    df.index = pd.to_datetime(df.index, format='%m-%d-%Y-%H%M')
+    track_dts = pd.to_datetime(df.index, format='%m-%d-%Y-%H%M')
 
     # Calculate the times between start & end that we want to interpolate
     # data for
-    interp_times = pd.date_range(start=start_dt, end=end_dt, freq=freq)
+    interp_times = pd.date_range(start=track_dts[0], end=track_dts[-1], freq=freq,
+                                 name='date-time')
 
-    # Resample the dataframe for 1-min
-    # Resampling removes 'name', 'basin', & 'storm_type' columns
-    # Resulting columns are: date-time (index), ['storm_num', 'lat', 'lon',
-    #                                            'mslp', 'wind', 'ss']
-    df = df.resample(freq).sum()
+    # Linearly interpolate each numeric column in time, using seconds since
+    # the first record as the time coordinate. The 'name', 'basin', &
+    # 'storm_type' columns are dropped
+    src_secs = (track_dts - track_dts[0]).total_seconds().values
+    dst_secs = (interp_times - track_dts[0]).total_seconds().values
 
-    # Set 0 values after the first row to NaN to prepare for interpolation
-    df[df.iloc[1:] == 0] = np.NaN
+    col_names = ['storm_num', 'lat', 'lon', 'mslp', 'wind', 'ss']
+    interp_data = {col: np.interp(dst_secs, src_secs, df[col].values.astype(np.float64))
+                   for col in col_names}
 
-    df = df.interpolate(method='time', limit_direction='forward')
+    df = pd.DataFrame(interp_data, index=interp_times, columns=col_names)
 
     return df
 
@@ -375,25 +450,16 @@ def plot_track_from_df(df, storm_name, year, extent=None, show=True, save=False,
         # x0, x1, y0, y1
         plt_extent = [-180, 0, 0, 90]
 
-    land_50m = cfeature.NaturalEarthFeature('physical', 'land', '50m', facecolor='none')
-    states_50m = cfeature.NaturalEarthFeature(category='cultural', name='admin_1_states_provinces',
-                                              scale='50m', facecolor='none')
-    countries_50m = cfeature.NaturalEarthFeature(category='cultural', name='admin_0_countries',
-                                                 scale='50m', facecolor='none')
+    land_50m = _ne_feature('physical', 'land', '50m')
+    states_50m = _ne_feature('cultural', 'admin_1_states_provinces', '50m')
+    countries_50m = _ne_feature('cultural', 'admin_0_countries', '50m')
 
     fig = plt.figure(figsize=(12, 8))
 
     ax = fig.add_subplot(111, projection=ccrs.Mercator())
 
     # Set axis background color to black
-    ax.imshow(
-        np.tile(
-            np.array(
-                [[[0, 0, 0]]], dtype=np.uint8),
-            [2, 2, 1]),
-        origin='upper', transform=crs_plt, extent=[-180, 180, -180, 180],
-        zorder=z_ord['base']
-    )
+    ax.background_patch.set_facecolor((0, 0, 0))
 
     ax.add_feature(land_50m, linewidth=.8, edgecolor='gray', zorder=z_ord['land'])
     ax.add_feature(countries_50m, linewidth=.8, edgecolor='gray', zorder=z_ord['land'])
@@ -446,30 +512,20 @@ def plot_raw_track(shp_path, storm_name, year, extent=None, show=True, save=Fals
         # x0, x1, y0, y1
         plt_extent = [-180, 0, 0, 90]
 
-    shp_reader = shpreader.Reader(shp_path)
-    track_pts = list(shp_reader.geometries())
-    lons = [pt.x for pt in track_pts]
-    lats = [pt.y for pt in track_pts]
+    track_pts = _read_points(shp_path)
+    lons = track_pts[:, 0]
+    lats = track_pts[:, 1]
 
-    land_50m = cfeature.NaturalEarthFeature('physical', 'land', '50m', facecolor='none')
-    states_50m = cfeature.NaturalEarthFeature(category='cultural', name='admin_1_states_provinces',
-                                              scale='50m', facecolor='none')
-    countries_50m = cfeature.NaturalEarthFeature(category='cultural', name='admin_0_countries',
-                                                 scale='50m', facecolor='none')
+    land_50m = _ne_feature('physical', 'land', '50m')
+    states_50m = _ne_feature('cultural', 'admin_1_states_provinces', '50m')
+    countries_50m = _ne_feature('cultural', 'admin_0_countries', '50m')
 
     fig = plt.figure(figsize=(12, 8))
 
     ax = fig.add_subplot(111, projection=ccrs.Mercator())
 
     # Set axis background color to black
-    ax.imshow(
-        np.tile(
-            np.array(
-                [[[0, 0, 0]]], dtype=np.uint8),
-            [2, 2, 1]),
-        origin='upper', transform=crs_plt, extent=[-180, 180, -180, 180],
-        zorder=z_ord['base']
-    )
+    ax.background_patch.set_facecolor((0, 0, 0))
 
     ax.add_feature(land_50m, linewidth=.8, edgecolor='gray', zorder=z_ord['land'])
     ax.add_feature(countries_50m, linewidth=.8, edgecolor='gray', zorder=z_ord['land'])
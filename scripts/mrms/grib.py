@@ -12,13 +12,36 @@ from mpl_toolkits.axes_grid1 import make_axes_locatable
 from cartopy.mpl.gridliner import LONGITUDE_FORMATTER, LATITUDE_FORMATTER
 import matplotlib.cm as cm
 from cartopy.feature import NaturalEarthFeature
-from os.path import join, isfile
+from os.path import join
+import os
 import sys
-from os import listdir, walk
+from os import walk
 import re
-from datetime import datetime
+from functools import lru_cache, partial
+from contextlib import closing
+from concurrent.futures import ProcessPoolExecutor
 
-from mrmsgrib import MRMSGrib
+from mrmsgrib import MRMSGrib, SCAN_RE, MEMMAP_PATH
+from mrmsbase import quantize
+
+# CONUS MRMS grid definition. Lats decrease with increasing row index
+GRID_LON0 = -129.995
+GRID_LAT0 = 54.995
+GRID_INC = 0.01
+GRID_NLON = 7000
+GRID_NLAT = 3500
+
+TIME_RE = re.compile(r'-(\d{4})')
+
+# Grib message keys printed by grid_info
+GRID_INFO_KEYS = ('gridType', 'gridDescriptionSectionPresent', 'gridDefinitionTemplateNumber',
+                  'gridDefinitionDescription', 'longitudeOfFirstGridPointInDegrees',
+                  'longitudeOfLastGridPointInDegrees', 'latitudeOfFirstGridPointInDegrees',
+                  'latitudeOfLastGridPointInDegrees')
+
+# Gridline tick locations for plot_grb
+LON_TICKS = np.arange(-180, 181)
+LAT_TICKS = np.arange(-90, 91)
 
 
 def print_keys(fname, keyword=None):
@@ -39,15 +62,14 @@ def print_keys(fname, keyword=None):
     None
     """
 
-    grb = pygrib.open(fname)
-    grb = grb[1]
+    keys, _ = _read_first_msg(fname)
 
     if (keyword is not None):
-        for key in grb.keys():
+        for key in keys:
             if keyword in key:
                 print(key)
     else:
-        for key in grb.keys():
+        for key in keys:
             print(key)
 
 
@@ -69,22 +91,16 @@ def get_keys(fname, keyword=None):
     -------
     keys : list of str
     """
-    grb = pygrib.open(fname)
-    grb = grb[1]
+    keys, _ = _read_first_msg(fname)
 
     if (keyword is not None):
-        keys = []
-
-        for key in grb.keys():
-            if keyword in key:
-                keys.append(key)
-        return keys
+        return [key for key in keys if keyword in key]
     else:
-        return grb.keys()
+        return list(keys)
 
 
 
-def get_grb_data(abs_path, mem_path, point1, point2, missing=0, debug=False):
+def get_grb_data(abs_path, mem_path, point1, point2, missing=0, quantized=False, debug=False):
     """
     Opens a MRMS Grib2 data file and creates a new MRMSGrib object.
 
@@ -94,6 +110,10 @@ def get_grb_data(abs_path, mem_path, point1, point2, missing=0, debug=False):
         The absolute path of the Grib2 file to open
     mem_path : str
         Absolute path to write the memory-mapped array
+    quantized : bool, optional
+        If True, the memory-mapped array is written as uint8 quantized
+        reflectivity (see mrmsbase.quantize), a quarter of the size of the
+        float32 array. Default is False
     debug : bool, optional
         If True, the function prints some file metadata
 
@@ -102,44 +122,47 @@ def get_grb_data(abs_path, mem_path, point1, point2, missing=0, debug=False):
     MRMSGrib object
     """
 
-    grid = init_grid()
     point1, point2 = _augment_coords(point1, point2)
 
-    min_lat, max_lat, min_lon, max_lon = get_bbox_indices(grid, point1, point2)
+    bbox, (grid_lons, grid_lats) = compute_bbox(point1, point2)
+    min_lat, max_lat, min_lon, max_lon = bbox
 
-    grid_lons, grid_lats = subset_grid(grid, [min_lat, max_lat, min_lon, max_lon]) # (lons, lats)
+    with closing(pygrib.open(abs_path)) as grb_file:
+        grb = grb_file[1]
 
-    grb_file = pygrib.open(abs_path)
-    grb = grb_file[1]
+        # Header keys can be read without unpacking the message's data section
+        major_ax = grb.earthMajorAxis
+        minor_ax = grb.earthMinorAxis
+        val_date = grb.validityDate
+        val_time = grb.validityTime
 
-    data = grb.values[max_lat : min_lat, min_lon : max_lon + 1] # changed from max_lon + 1
+        # GRIB2 packing forces the whole CONUS field to be decoded, so unpack it
+        # once and copy out the bounding box. Copying (rather than keeping a view)
+        # lets the full-grid array be freed as soon as the slice is taken. The
+        # copy is cast to float32, the dtype of the memmap it's written to
+        data = np.array(grb.values[max_lat : min_lat, min_lon : max_lon + 1], dtype=np.float32) # changed from max_lon + 1
 
     if (missing == 0):
-        data[data < 0] = 0
+        np.maximum(data, 0, out=data)
     elif (missing == 'nan'):
-        data[data < 0] = float(nan)
+        np.putmask(data, data < 0, np.nan)
     else:
         raise ValueError('Invalid missing data argument (grib.subset_data)')
 
     path, fname = abs_path.rsplit('/', 1)
     data_shape = data.shape
 
-    out_path = join(memmap_path, fname.replace('grib2', 'txt'))
+    out_path = join(mem_path, fname.replace('grib2', 'txt'))
 
-    fp = np.memmap(out_path, dtype='float32', mode='w+', shape=data_shape)
-    fp[:] = data[:]
+    if (quantized):
+        fp = np.memmap(out_path, dtype=np.uint8, mode='w+', shape=data_shape)
+        quantize(data, out=fp)
+    else:
+        fp = np.memmap(out_path, dtype='float32', mode='w+', shape=data_shape)
+        np.copyto(fp, data)
+    fp.flush()
     del fp
 
-    major_ax = grb.earthMajorAxis
-    minor_ax = grb.earthMinorAxis
-    val_date = grb.validityDate
-    val_time = grb.validityTime
-
-    del grb
-
-    grb_file.close()
-    grb_file = None
-
     if (debug):
         print('data array shape (y, x):', data.shape)
         print('validity date:', val_date)
@@ -148,17 +171,23 @@ def get_grb_data(abs_path, mem_path, point1, point2, missing=0, debug=False):
         print('minor axis:', minor_ax)
         print('------------------------------------')
 
-    return MRMSGrib(val_date, val_time, major_ax, minor_ax, path, fname, data_shape, grid_lons=grid_lons, grid_lats=grid_lats)
+    return MRMSGrib(val_date, val_time, major_ax, minor_ax, path, fname, data_shape,
+                    grid_lons=grid_lons, grid_lats=grid_lats, data_path=out_path,
+                    quantized=quantized)
 
 
 
-def plot_grb(grb):
+def plot_grb(grb, use_pcolormesh=False):
     """
     Takes a MRMSGrib object and plots it on a Mercator projection
 
     Parameters
     ----------
     grb : MRMSGrib object
+    use_pcolormesh : bool, optional
+        If True, the data is drawn with pcolormesh instead of imshow. The MRMS
+        grid is a regular lat/lon grid, so imshow is used by default as it is
+        much faster. Default is False
 
     Returns
     -------
@@ -167,10 +196,7 @@ def plot_grb(grb):
 
     fig = plt.figure(figsize=(8, 6)) #dpi = 200
 
-    globe = ccrs.Globe(semimajor_axis=grb.major_axis, semiminor_axis=grb.minor_axis,
-                       flattening=None)
-
-    ax = fig.add_subplot(1, 1, 1, projection=ccrs.Mercator(globe=globe))
+    ax = fig.add_subplot(1, 1, 1, projection=_grb_projection(grb.major_axis, grb.minor_axis))
 
     states = NaturalEarthFeature(category='cultural', scale='50m', facecolor='none',
                              name='admin_1_states_provinces_shp')
@@ -179,17 +205,23 @@ def plot_grb(grb):
 
     ax.set_extent([min(grb.grid_lons), max(grb.grid_lons), min(grb.grid_lats), max(grb.grid_lats)], crs=ccrs.PlateCarree())
 
-    cmesh = plt.pcolormesh(grb.grid_lons, grb.grid_lats, grb.data, transform=ccrs.PlateCarree(), cmap=cm.gist_ncar)
-
-    lon_ticks = [x for x in range(-180, 181)]
-    lat_ticks = [x for x in range(-90, 91)]
+    if (use_pcolormesh):
+        # Draw in the native projection coordinates so cartopy doesn't have to
+        # re-project every grid vertex on each draw
+        xs, ys = _projected_mesh(grb)
+        cmesh = ax.pcolormesh(xs, ys, grb.data, cmap=cm.gist_ncar)
+    else:
+        # The first row of the data subset is the northernmost, hence origin='upper'
+        extent = [min(grb.grid_lons), max(grb.grid_lons), min(grb.grid_lats), max(grb.grid_lats)]
+        cmesh = ax.imshow(grb.data, origin='upper', extent=extent, transform=ccrs.PlateCarree(),
+                          cmap=cm.gist_ncar, interpolation='nearest')
 
     gl = ax.gridlines(crs=ccrs.PlateCarree(), linewidth=1, color='gray',
                       alpha=0.5, linestyle='--', draw_labels=True)
     gl.xlabels_top = False
     gl.ylabels_right=False
-    gl.xlocator = mticker.FixedLocator(lon_ticks)
-    gl.ylocator = mticker.FixedLocator(lat_ticks)
+    gl.xlocator = mticker.FixedLocator(LON_TICKS)
+    gl.ylocator = mticker.FixedLocator(LAT_TICKS)
     gl.xformatter = LONGITUDE_FORMATTER
     gl.yformatter = LATITUDE_FORMATTER
     gl.xlabel_style = {'color': 'red', 'weight': 'bold'}
@@ -212,6 +244,76 @@ def plot_grb(grb):
 
 
 
+def _grb_projection(major_axis, minor_axis):
+    """
+    Builds the Mercator projection MRMS grids are plotted in, on the globe
+    defined by the grid's major & minor axes
+
+    Parameters
+    ----------
+    major_axis : int or str
+    minor_axis : int or str
+
+    Returns
+    -------
+    cartopy.crs.Mercator
+    """
+    globe = ccrs.Globe(semimajor_axis=major_axis, semiminor_axis=minor_axis,
+                       flattening=None)
+
+    return ccrs.Mercator(globe=globe)
+
+
+
+def _projected_mesh(grb):
+    """
+    Projects a MRMSGrib object's lat/lon grid into the projection used by
+    plot_grb. The result is cached so that consecutive plots (i.e., animation
+    frames) of the same grid only pay for the transformation once
+
+    Parameters
+    ----------
+    grb : MRMSGrib object
+
+    Returns
+    -------
+    Tuple of numpy 2d arrays of float
+        Projected grid coordinates. Format: (x, y)
+    """
+    return _mesh_for_grid(tuple(grb.grid_lons.tolist()), tuple(grb.grid_lats.tolist()),
+                          grb.major_axis, grb.minor_axis)
+
+
+
+@lru_cache(maxsize=2)
+def _mesh_for_grid(grid_lons, grid_lats, major_axis, minor_axis):
+    """
+    Projects a lat/lon grid into the Mercator projection on the grid's globe.
+    The coordinates are passed as tuples so that the whole grid is the cache
+    key, & the cache is kept small as each entry holds 2 full-grid arrays
+
+    Parameters
+    ----------
+    grid_lons : tuple of float
+    grid_lats : tuple of float
+    major_axis : int or str
+    minor_axis : int or str
+
+    Returns
+    -------
+    Tuple of numpy 2d arrays of float
+        Projected grid coordinates. Format: (x, y)
+    """
+    proj = _grb_projection(major_axis, minor_axis)
+
+    lons, lats = np.meshgrid(np.asarray(grid_lons), np.asarray(grid_lats))
+    pts = proj.transform_points(ccrs.PlateCarree(), lons, lats)
+
+    # Copied so the cache doesn't keep the unused z plane of pts alive
+    return (pts[..., 0].copy(), pts[..., 1].copy())
+
+
+
 def get_files_in_dir(path):
     """
     Returns a list of all the files in the specified directory
@@ -226,7 +328,8 @@ def get_files_in_dir(path):
     files : list of str
         List of the filenames found in the directory
     """
-    files = [f for f in listdir(path) if isfile(join(path, f))]
+    with os.scandir(path) as entries:
+        files = [entry.name for entry in entries if entry.is_file()]
 
     return files
 
@@ -246,15 +349,42 @@ def grid_info(fname):
     None
 
     """
-    grb = pygrib.open(fname)
-    grb = grb[1]
+    _, info = _read_first_msg(fname)
+
+    print('Grid type:', info['gridType'])
+    print('Grid Description Section Present:', info['gridDescriptionSectionPresent'])
+    print('Grid Definition Template Number:', info['gridDefinitionTemplateNumber'])
+    print('Grid Definition Description:', info['gridDefinitionDescription'])
+    print('Grid Longitudes (First, Last):', info['longitudeOfFirstGridPointInDegrees'], info['longitudeOfLastGridPointInDegrees'])
+    print('Grid Latitudes (First, Last):', info['latitudeOfFirstGridPointInDegrees'], info['latitudeOfLastGridPointInDegrees'])
+
+
+
+@lru_cache(maxsize=8)
+def _read_first_msg(fname):
+    """
+    Reads the keys & grid metadata of the first message in a grib file. The
+    results are cached so that repeated inspections of the same file don't
+    re-open it. Only a snapshot of the metadata is returned (and cached) so
+    that no file handles are held open
+
+    Parameters
+    ----------
+    fname : str
+        Absolute path of the MRMS Grib2 file to open
+
+    Returns
+    -------
+    Tuple of (tuple of str, dict)
+        The message keys & the values of the keys in GRID_INFO_KEYS
+        Format: (keys, info)
+    """
+    with closing(pygrib.open(fname)) as grb_file:
+        grb = grb_file[1]
+        keys = tuple(grb.keys())
+        info = {key: grb[key] for key in GRID_INFO_KEYS}
 
-    print('Grid type:', grb.gridType)
-    print('Grid Description Section Present:', grb.gridDescriptionSectionPresent)
-    print('Grid Definition Template Number:', grb.gridDefinitionTemplateNumber)
-    print('Grid Definition Description:', grb.gridDefinitionDescription)
-    print('Grid Longitudes (First, Last):', grb.longitudeOfFirstGridPointInDegrees, grb.longitudeOfLastGridPointInDegrees)
-    print('Grid Latitudes (First, Last):', grb.latitudeOfFirstGridPointInDegrees, grb.latitudeOfLastGridPointInDegrees)
+    return (keys, info)
 
 
 
@@ -270,18 +400,12 @@ def init_grid(debug=None):
 
     Returns
     -------
-    Tuple of lists of float
-        Tuple containing the list of longitude coordinates and the list of latitude
-        coordinates. Format: (lons, lats)
+    Tuple of numpy 1d arrays of float
+        Tuple containing the array of longitude coordinates and the array of
+        latitude coordinates. Format: (lons, lats)
 
     """
-    inc = 0.01
-    lons = np.arange(-129.995, -60.005, inc) # -129.995 to -60.005
-    lats = np.arange(54.995, 19.995, inc * -1) # 54.995 to 20.005
-    #grid = np.meshgrid(lons, lats)
-
-    lons = trunc(lons, 3)
-    lats = trunc(lats, 3)
+    lons, lats = _conus_grid()
 
     if (debug):
         print("Lons length:", len(lons))
@@ -295,6 +419,32 @@ def init_grid(debug=None):
 
 
 
+@lru_cache(maxsize=1)
+def _conus_grid():
+    """
+    Builds the CONUS MRMS grid coordinates. The grid never changes, so it is
+    only computed once and the arrays are made read-only so they can be
+    safely shared (and sliced into views) by every caller
+
+    Returns
+    -------
+    Tuple of numpy 1d arrays of float
+        Format: (lons, lats)
+    """
+    inc = 0.01
+    lons = np.arange(-129.995, -60.005, inc) # -129.995 to -60.005
+    lats = np.arange(54.995, 19.995, inc * -1) # 54.995 to 20.005
+
+    lons = trunc(lons, 3)
+    lats = trunc(lats, 3)
+
+    lons.setflags(write=False)
+    lats.setflags(write=False)
+
+    return (lons, lats)
+
+
+
 def get_bbox_indices(grid, point1, point2, debug=False):
     """
     Searches through the grid to find the indices of the gridpoints corresponding
@@ -325,14 +475,15 @@ def get_bbox_indices(grid, point1, point2, debug=False):
     grid_lons = grid[0]
     grid_lats = grid[1]
 
-    lats = np.array([point1[0], point2[0]])
-    lons = np.array([point1[1], point2[1]])
-
-    min_lon = (np.abs(grid_lons - np.amin(lons))).argmin()
-    max_lon = (np.abs(grid_lons - np.amax(lons))).argmin()
+    # The grid coordinates are monotonic (lons ascending, lats descending), so
+    # a binary search can be used in place of a full-array argmin scan
+    min_lon = _nearest_idx(grid_lons, min(point1[1], point2[1]))
+    max_lon = _nearest_idx(grid_lons, max(point1[1], point2[1]))
 
-    min_lat = (np.abs(grid_lats - np.amin(lats))).argmin()
-    max_lat = (np.abs(grid_lats - np.amax(lats))).argmin()
+    # Search the reversed (ascending) view of the lats & map the index back
+    last_lat = len(grid_lats) - 1
+    min_lat = last_lat - _nearest_idx(grid_lats[::-1], min(point1[0], point2[0]))
+    max_lat = last_lat - _nearest_idx(grid_lats[::-1], max(point1[0], point2[0]))
 
     """
     min_lon = np.where(grid_lons == np.amin(lons))[0][0]
@@ -345,10 +496,10 @@ def get_bbox_indices(grid, point1, point2, debug=False):
     #indices = {'min_lon': min_lon[0][0], 'max_lon': max_lon[0][0], 'min_lat': min_lat[0][0], 'max_lat': max_lat[0][0]}
 
     if (debug):
-        print('min lon idx:', indices['min_lon'])
-        print('max lon idx:', indices['max_lon'])
-        print('min lat idx:', indices['min_lat'])
-        print('max lat idx:', indices['max_lat'])
+        print('min lon idx:', min_lon)
+        print('max lon idx:', max_lon)
+        print('min lat idx:', min_lat)
+        print('max lat idx:', max_lat)
         print('------------------------------------')
 
     #return indices
@@ -356,23 +507,125 @@ def get_bbox_indices(grid, point1, point2, debug=False):
 
 
 
+def compute_bbox(point1, point2, debug=False):
+    """
+    Computes the indices of the CONUS MRMS gridpoints corresponding to the
+    bounding box formed by point1 and point2, as well as the coordinates of
+    the grid subset the bounding box defines. The grid is regular, so the
+    indices & coordinates are computed directly from the grid definition
+    rather than searching the full CONUS coordinate arrays
+
+    Parameters
+    ----------
+    point1 : tuple of floats
+        Coordinates of the first point.
+        Format: (lat, lon)
+    point2: tuple of floats
+        Coordinates of the second point.
+        Format: (lat, lon)
+    debug : bool, optional
+        If True, the indices & subset coordinate lengths are printed
+
+    Returns
+    -------
+    Tuple of (tuple of int, tuple of numpy 1d arrays of float)
+        Bounding box indices & subset grid coordinates
+        Format: ((min_lat, max_lat, min_lon, max_lon), (lons, lats))
+    """
+    min_lon = _grid_idx(min(point1[1], point2[1]), GRID_LON0, GRID_INC, GRID_NLON)
+    max_lon = _grid_idx(max(point1[1], point2[1]), GRID_LON0, GRID_INC, GRID_NLON)
+
+    min_lat = _grid_idx(min(point1[0], point2[0]), GRID_LAT0, -GRID_INC, GRID_NLAT)
+    max_lat = _grid_idx(max(point1[0], point2[0]), GRID_LAT0, -GRID_INC, GRID_NLAT)
+
+    # Same index conventions as subset_grid
+    lons = np.round(GRID_LON0 + np.arange(min_lon, max_lon + 1) * GRID_INC, 3)
+    lats = np.round(GRID_LAT0 - np.arange(max_lat, min_lat) * GRID_INC, 3)
+
+    if (debug):
+        print('min lon idx:', min_lon)
+        print('max lon idx:', max_lon)
+        print('min lat idx:', min_lat)
+        print('max lat idx:', max_lat)
+        print('lons (x) length:', len(lons))
+        print('lats (y) length:', len(lats))
+        print('------------------------------------')
+
+    return ((min_lat, max_lat, min_lon, max_lon), (lons, lats))
+
+
+
+def _grid_idx(val, start, inc, num):
+    """
+    Computes the index of the gridpoint nearest to a coordinate value along
+    one axis of a regular grid, clipped to the bounds of the grid
+
+    Parameters
+    ----------
+    val : float
+        Coordinate value
+    start : float
+        Coordinate of the first gridpoint
+    inc : float
+        Grid spacing. Negative if the coordinates decrease along the axis
+    num : int
+        Number of gridpoints along the axis
+
+    Returns
+    -------
+    int
+    """
+    idx = int(round((val - start) / inc))
+
+    return min(max(idx, 0), num - 1)
+
+
+
+def _nearest_idx(vals, val):
+    """
+    Finds the index of the element of a sorted (ascending) array that is
+    closest to a given value
+
+    Parameters
+    ----------
+    vals : numpy 1d array of float
+        Array of values sorted in ascending order
+    val : float
+        Value to search for
+
+    Returns
+    -------
+    idx : int
+        Index of the element of vals closest to val
+    """
+    idx = np.searchsorted(vals, val)
+    idx = min(max(idx, 1), len(vals) - 1)
+
+    if ((val - vals[idx - 1]) <= (vals[idx] - val)):
+        idx -= 1
+
+    return int(idx)
+
+
+
 def trunc(vals, decs=0):
     """
-    Truncates a list of floats to 3 decimal places
+    Truncates an array of floats to the given number of decimal places
 
     Parameters
     ----------
-    vals : list of float
-        List of values to be truncated
+    vals : list or numpy 1d array of float
+        Values to be truncated
     decs : int
         The decimal place to truncate to. Default is 0
 
     Returns
     -------
-    List of floats
+    numpy 1d array of float
 
     """
-    trunc_vals = [np.trunc(x*10**decs)/(10**decs) for x in vals]
+    scale = 10.0 ** decs
+    trunc_vals = np.trunc(np.asarray(vals) * scale) / scale
     return trunc_vals
 
 
@@ -451,9 +704,9 @@ def subset_data(bbox, data, missing=0, debug=False):
     subset = data[y_max : y_min, x_min : x_max + 1]
 
     if (missing == 0):
-        subset[subset < 0] = 0
+        np.maximum(subset, 0, out=subset)
     elif (missing == 'nan'):
-        subset[subset < 0] = float(nan)
+        np.putmask(subset, subset < 0, np.nan)
     else:
         raise ValueError('Invalid missing data argument (grib.subset_data)')
 
@@ -493,8 +746,6 @@ def fetch_scans(base_path, time, angles=None):
 
     """
     scans = []
-    time_re = re.compile(r'-(\d{4})')
-    scan_re = re.compile(r'_(\d{2}.\d{2})_')
 
     if (isinstance(time, int)):
         time = str(time)
@@ -503,24 +754,29 @@ def fetch_scans(base_path, time, angles=None):
             hours, mins = time.split(':')
             time = hours + mins
 
+    # Minutes past 00z of the target time, used to find the nearest scan
+    target_mins = int(time[:-2]) * 60 + int(time[-2:])
+
+    if (angles):
+        angles = frozenset(angles)
+
     for subdir, dirs, files in walk(base_path):
         curr_fname = None
         curr_tdelta = 6
         for file in files:
-            time_match = time_re.search(file)
+            time_match = TIME_RE.search(file)
             if (time_match is not None):
                 found_time = time_match.group(1)
                 if (angles):
-                    angle_match = scan_re.search(file)
+                    angle_match = SCAN_RE.search(file)
                     if (angle_match is not None and angle_match.group(1) in angles and found_time == time):
                         scans.append(file)
                 else:
                     if (found_time == time):
                         scans.append(file)
                     else:
-                        FMT = '%H%M'
-                        tdelta = (datetime.strptime(found_time, FMT) - datetime.strptime(time, FMT)).total_seconds()
-                        tdelta = abs(tdelta)
+                        found_mins = int(found_time[:2]) * 60 + int(found_time[2:])
+                        tdelta = abs(found_mins - target_mins) * 60
                         if (tdelta < abs(curr_tdelta)):
                             curr_tdelta = tdelta
                             curr_fname = file
@@ -550,8 +806,7 @@ def parse_fname(base_path, fname):
     """
     base_path += '/MergedReflectivityQC_'
 
-    scan_re = re.compile(r'_(\d{2}.\d{2})_')
-    match = scan_re.search(fname)
+    match = SCAN_RE.search(fname)
 
     if (match is not None):
         base_path += match.group(1)
@@ -565,7 +820,7 @@ def parse_fname(base_path, fname):
 
 
 
-def get_grib_objs(scans, base_path, point1, point2):
+def get_grib_objs(scans, base_path, point1, point2, mem_path=MEMMAP_PATH, workers=None, quantized=False):
     """
     Creates and returns a list of new MRMSGrib objects
 
@@ -576,6 +831,21 @@ def get_grib_objs(scans, base_path, point1, point2):
     base_path : str
         Path to the directory that holds the subdirectories of the various scan
         angles
+    point1 : tuple of floats
+        First coordinate pair defining the bounding box
+        Format: (lat, lon)
+    point2 : tuple of floats
+        Second coordinate pair defining the bounding box
+        Format: (lat, lon)
+    mem_path : str, optional
+        Path of the directory to write the memory-mapped arrays to
+    workers : int, optional
+        Number of processes to decode the files with. Each file is independent,
+        so they are decoded in parallel. Defaults to the number of CPUs. If 1,
+        the files are decoded serially
+    quantized : bool, optional
+        If True, the data arrays are written as uint8 quantized reflectivity.
+        Default is False
 
     Returns
     -------
@@ -587,21 +857,82 @@ def get_grib_objs(scans, base_path, point1, point2):
     if (not isinstance(scans, (list,))):
         scans = [scans]
 
-    for file in scans:
-        print('Parsing ', file)
+    if (workers is None):
+        workers = os.cpu_count()
 
-        f_path = parse_fname(base_path, file)
+    f_paths = [parse_fname(base_path, file) for file in scans]
 
-        grid = init_grid()
+    if (workers > 1 and len(f_paths) > 1):
+        parse = partial(_parse_grb_file, mem_path=mem_path, point1=point1, point2=point2,
+                        quantized=quantized)
 
-        grb_file = get_grb_data(f_path, point1, point2)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            grb_files = list(executor.map(parse, f_paths))
+    else:
+        for idx, f_path in enumerate(f_paths):
+            # Have the kernel start reading the next file while this one is decoded
+            if (idx + 1 < len(f_paths)):
+                _prefetch_file(f_paths[idx + 1])
 
-        grb_files.append(grb_file)
+            grb_file = _parse_grb_file(f_path, mem_path, point1, point2, quantized=quantized)
+
+            grb_files.append(grb_file)
 
     return grb_files
 
 
 
+def _parse_grb_file(f_path, mem_path, point1, point2, quantized=False):
+    """
+    Worker function for get_grib_objs. Creates a MRMSGrib object from a single
+    MRMS Grib2 file
+
+    Parameters
+    ----------
+    f_path : str
+        Absolute path of the Grib2 file to open
+    mem_path : str
+        Path of the directory to write the memory-mapped array to
+    point1 : tuple of floats
+    point2 : tuple of floats
+    quantized : bool, optional
+
+    Returns
+    -------
+    MRMSGrib object
+    """
+    print('Parsing ', f_path.rsplit('/', 1)[-1])
+
+    return get_grb_data(f_path, mem_path, point1, point2, quantized=quantized)
+
+
+
+def _prefetch_file(f_path):
+    """
+    Advises the kernel that a file will be read in its entirety soon so that
+    it can begin asynchronous readahead into the page cache. This is a no-op
+    on platforms without posix_fadvise
+
+    Parameters
+    ----------
+    f_path : str
+        Absolute path of the file to prefetch
+
+    Returns
+    -------
+    None
+    """
+    if (not hasattr(os, 'posix_fadvise')):
+        return
+
+    fd = os.open(f_path, os.O_RDONLY)
+    try:
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+    finally:
+        os.close(fd)
+
+
+
 def _augment_coords(point1, point2):
     point1 = list(point1)
     point2 = list(point2)
@@ -0,0 +1,215 @@
+"""
+Author: Matt Nicholson
+
+Base class for objects holding a memory-mapped Multi-Radar/Multi-Sensor System
+(MRMS) data array
+"""
+import numpy as np
+
+# Reflectivity quantization. MRMS reflectivity has a 0.5 dBZ resolution, so
+# quantized arrays store round((dbz - REF_OFFSET) / REF_SCALE) as uint8, which
+# covers -32 to 95 dBZ. REF_FILL marks missing (NaN) gridpoints
+REF_SCALE = 0.5
+REF_OFFSET = -32.0
+REF_FILL = 255
+
+class MRMSBase(object):
+    """
+    Base class for the MRMSGrib & MRMSComposite objects. Attributes are stored
+    in slots rather than a per-instance __dict__, as large batches of these
+    objects are created when building composites & cross sections
+    """
+
+    __slots__ = ('validity_date', 'validity_time', 'major_axis', 'minor_axis',
+                 'data_path', 'fname', 'shape', 'grid_lons', 'grid_lats',
+                 'quantized', '_data_mm', '_grid_bounds')
+
+    def __init__(self, validity_date, validity_time, major_axis, minor_axis, data_path, fname, shape, grid_lons=None, grid_lats=None, quantized=False):
+        """
+        Initializes the attributes shared by all MRMS data objects
+
+        Parameters
+        ----------
+        validity_date : int or str
+        validity_time : int or str
+        major_axis : int or str
+        minor_axis : int or str
+        data_path : str
+        fname : str
+        shape : tuple
+        grid_lons : list
+        grid_lats : list
+        quantized : bool, optional
+
+        Attributes
+        ----------
+        validity_date : int or str
+            Validity date of the MRMS data
+        validity_time : int or str
+            Validity time of the MRMS data
+        major_axis : int or str
+            Major axis of projection
+        minor_axis : int or str
+            Minor axis of projection
+        data_path : str
+            Path of the memory-mapped array file containing the MRMS data array
+        fname : str
+            Name of the MRMS file
+        shape : tuple
+            Shape of the MRMS data array
+        grid_lons : numpy 1d array of float32
+            Grid longitude coordinates
+        grid_lats : numpy 1d array of float32
+            Grid latitude coordinates
+        quantized : bool
+            If True, the memory-mapped array holds uint8 quantized reflectivity
+            (see quantize) rather than float32
+
+        """
+        super(MRMSBase, self).__init__()
+        self.validity_date = validity_date
+        self.validity_time = validity_time
+        self.major_axis = major_axis
+        self.minor_axis = minor_axis
+        self.data_path = data_path
+        self.fname = fname
+        self.shape = shape
+        self.grid_lons = _as_coords(grid_lons)
+        self.grid_lats = _as_coords(grid_lats)
+        self.quantized = quantized
+        self._data_mm = None
+        self._grid_bounds = None
+
+
+
+    @property
+    def raw_data(self):
+        """
+        The object's memory-mapped data array, as stored on disk (uint8 if the
+        object is quantized, float32 otherwise). Nothing is read from disk
+        until the array is indexed. The file is only mapped on first access,
+        subsequent accesses reuse it
+        """
+        if (self._data_mm is None):
+            self._data_mm = np.memmap(self.data_path, dtype=self.data_dtype, mode='r', shape=self.shape)
+
+        return self._data_mm
+
+
+
+    @property
+    def data(self):
+        """
+        MRMS reflectivity data in dBZ. If the object is not quantized this is
+        the memory-mapped array itself, otherwise it is dequantized on access
+        """
+        if (self.quantized):
+            return dequantize(self.raw_data)
+
+        return self.raw_data
+
+
+
+    @property
+    def data_dtype(self):
+        """
+        dtype of the memory-mapped data array on disk
+        """
+        return np.uint8 if self.quantized else np.float32
+
+
+
+    @property
+    def grid_bounds(self):
+        """
+        Extent of the object's grid, computed on first access
+
+        Format: (min lon, lon range, max lat, lat range)
+        """
+        if (self._grid_bounds is None):
+            lons = np.asarray(self.grid_lons)
+            lats = np.asarray(self.grid_lats)
+            self._grid_bounds = (lons.min(), np.ptp(lons), lats.max(), np.ptp(lats))
+
+        return self._grid_bounds
+
+
+
+    def get_data_path(self):
+        return self.data_path
+
+
+
+def _as_coords(coords):
+    """
+    Converts grid coordinates to a 1-D float32 array. The grid is regular, so
+    only the 1-D lon & lat coordinates are stored, never a 2-D meshgrid
+
+    Parameters
+    ----------
+    coords : list or numpy 1d array of float, or None
+
+    Returns
+    -------
+    numpy 1d array of float32, or None if coords is None
+    """
+    if (coords is None):
+        return None
+
+    return np.asarray(coords, dtype=np.float32).ravel()
+
+
+
+def quantize(data, out=None):
+    """
+    Quantizes reflectivity data to uint8. NaNs are stored as REF_FILL, values
+    outside of the quantized range are clipped to it
+
+    Parameters
+    ----------
+    data : numpy nd array of float
+        Reflectivity, in dBZ
+    out : numpy nd array of uint8, optional
+        Array to write the quantized values to
+
+    Returns
+    -------
+    numpy nd array of uint8
+    """
+    if (out is None):
+        out = np.empty(np.shape(data), dtype=np.uint8)
+
+    scaled = np.round((np.asarray(data, dtype=np.float32) - REF_OFFSET) / REF_SCALE)
+    nans = np.isnan(scaled)
+    np.clip(scaled, 0, REF_FILL - 1, out=scaled)
+    scaled[nans] = REF_FILL
+    np.copyto(out, scaled, casting='unsafe')
+
+    return out
+
+
+
+def dequantize(raw, out=None):
+    """
+    Converts uint8 quantized reflectivity back to float32 dBZ. Gridpoints
+    holding REF_FILL are set to NaN
+
+    Parameters
+    ----------
+    raw : numpy nd array of uint8
+        Quantized reflectivity
+    out : numpy nd array of float32, optional
+        Array to write the dequantized values to
+
+    Returns
+    -------
+    numpy nd array of float32
+    """
+    if (out is None):
+        out = np.empty(np.shape(raw), dtype=np.float32)
+
+    np.multiply(raw, np.float32(REF_SCALE), out=out)
+    out += np.float32(REF_OFFSET)
+    np.putmask(out, np.asarray(raw) == REF_FILL, np.nan)
+
+    return out
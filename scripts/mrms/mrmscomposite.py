@@ -1,9 +1,18 @@
-class MRMSComposite(object):
+"""
+Author: Matt Nicholson
+
+A class for composite Multi-Radar/Multi-Sensor System (MRMS) reflectivity products
+"""
+from mrmsbase import MRMSBase
+
+class MRMSComposite(MRMSBase):
     """
-    Class for the MRMSGrib object
+    Class for the MRMSComposite object
     """
 
-    def __init__(self, validity_date, validity_time, major_axis, minor_axis, data_path, fname, shape, grid_lons=None, grid_lats=None):
+    __slots__ = ()
+
+    def __init__(self, validity_date, validity_time, major_axis, minor_axis, data_path, fname, shape, grid_lons=None, grid_lats=None, quantized=False):
         """
         Initializes a new MRMSComposite object
 
@@ -18,6 +27,7 @@ class MRMSComposite(object):
         shape : tuple
         grid_lons : list
         grid_lats : list
+        quantized : bool, optional
 
         Attributes
         ----------
@@ -39,25 +49,14 @@ class MRMSComposite(object):
             Grid longitude coordinates
         grid_lats : list of float
             Grid latitude coordinates
+        quantized : bool
+            If True, the memory-mapped array holds uint8 quantized reflectivity
 
         """
-        memmap_path = '/media/mnichol3/pmeyers1/MattNicholson/data'
-
-        super(MRMSComposite, self).__init__()
-        self.validity_date = validity_date
-        self.validity_time = validity_time
-        self.major_axis = major_axis
-        self.minor_axis = minor_axis
-        self.data_path = data_path
-        self.fname = fname
-        self.shape = shape
-        self.grid_lons = grid_lons
-        self.grid_lats = grid_lats
-
-
-
-    def get_data_path(self):
-        return self.data_path
+        super(MRMSComposite, self).__init__(validity_date, validity_time, major_axis,
+                                            minor_axis, data_path, fname, shape,
+                                            grid_lons=grid_lons, grid_lats=grid_lats,
+                                            quantized=quantized)
 
 
 
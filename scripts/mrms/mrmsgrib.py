@@ -6,12 +6,23 @@ A class for local Multi-Radar/Multi-Sensor System (MRMS) GRIB files
 import re
 from os.path import join
 
-class MRMSGrib(object):
+import numpy as np
+
+from mrmsbase import MRMSBase, _as_coords, quantize
+
+SCAN_RE = re.compile(r'_(\d{2}\.\d{2})_')
+
+# Default directory for the memory-mapped data arrays
+MEMMAP_PATH = '/media/mnichol3/pmeyers1/MattNicholson/data'
+
+class MRMSGrib(MRMSBase):
     """
     Class for the MRMSGrib object
     """
 
-    def __init__(self, validity_date, validity_time, major_axis, minor_axis, path, fname, shape, grid_lons=None, grid_lats=None):
+    __slots__ = ('path', 'scan_angle')
+
+    def __init__(self, validity_date, validity_time, major_axis, minor_axis, path, fname, shape, grid_lons=None, grid_lats=None, data_path=None, quantized=False):
         """
         Initializes a new MRMSGrib object
 
@@ -19,10 +30,18 @@ class MRMSGrib(object):
         ----------
         validity_date : int or str
         validity_time : int or str
-        data : numpy 2d array
         major_axis : int or str
         minor_axis : int or str
-        abs_path : str
+        path : str
+        fname : str
+        shape : tuple
+        grid_lons : list, optional
+        grid_lats : list, optional
+        data_path : str, optional
+            Absolute path of the memory-mapped data array. Defaults to the
+            grib filename, with a .txt extension, in the default memmap directory
+        quantized : bool, optional
+            If True, the memory-mapped array holds uint8 quantized reflectivity
 
         Attributes
         ----------
@@ -30,8 +49,8 @@ class MRMSGrib(object):
             Validity date of the MRMS grib file
         validity_time : int or str
             Validity time of the MRMS grib file
-        data : numpy 2d array
-            MRMS reflectivity data
+        data : numpy memmap
+            MRMS reflectivity data (read-only, see the data property)
         major_axis : int or str
             Major axis of projection
         minor_axis : int or str
@@ -48,19 +67,14 @@ class MRMSGrib(object):
             Scan angle of the MRMS reflectivity data
 
         """
-        memmap_path = '/media/mnichol3/pmeyers1/MattNicholson/data'
-
-        super(MRMSGrib, self).__init__()
-        self.validity_date = validity_date
-        self.validity_time = validity_time
-        self.major_axis = major_axis
-        self.minor_axis = minor_axis
-        self.data_path = join(memmap_path, fname.replace('grib2', 'txt'))
+        if (data_path is None):
+            data_path = join(MEMMAP_PATH, fname.replace('grib2', 'txt'))
+
+        super(MRMSGrib, self).__init__(validity_date, validity_time, major_axis,
+                                       minor_axis, data_path, fname, shape,
+                                       grid_lons=grid_lons, grid_lats=grid_lats,
+                                       quantized=quantized)
         self.path = path
-        self.fname = fname
-        self.shape = shape
-        self.grid_lons = grid_lons
-        self.grid_lats = grid_lats
         self.scan_angle = None
         self.parse_scan_angle(join(self.path, self.fname))
 
@@ -97,8 +111,7 @@ class MRMSGrib(object):
         None, sets the MRMSGrib object's scan_angle attribute
 
         """
-        scan_re = re.compile(r'_(\d{2}.\d{2})_')
-        match = scan_re.search(fname)
+        match = SCAN_RE.search(fname)
 
         if (match is not None):
             self.scan_angle = match.group(1)
@@ -107,21 +120,26 @@ class MRMSGrib(object):
 
     def set_data(self, new_data):
         """
-        Deletes the data currently held by the MRMSGrib object's data field and
-        replaces it
+        Overwrites the data in the MRMSGrib object's memory-mapped array file
+        in place
 
         Parameters
         ----------
         new_data : numpy 2d array
+            Must have the same shape as the MRMSGrib object's data
 
         Returns
         -------
-        None, sets the MRMSGrib object's data attribute
+        None, modifies the file at the MRMSGrib object's data_path
 
         """
-        del self.data
-        self.data = None
-        self.data = new_data
+        fp = np.memmap(self.data_path, dtype=self.data_dtype, mode='r+', shape=self.shape)
+        if (self.quantized):
+            quantize(new_data, out=fp)
+        else:
+            np.copyto(fp, new_data, casting='same_kind')
+        fp.flush()
+        del fp
 
 
 
@@ -134,7 +152,8 @@ class MRMSGrib(object):
         -------
 
         """
-        self.grid_lons = lons
+        self.grid_lons = _as_coords(lons)
+        self._grid_bounds = None
 
 
 
@@ -147,12 +166,8 @@ class MRMSGrib(object):
         -------
 
         """
-        self.grid_lats = lats
-
-
-
-    def get_data_path(self):
-        return self.data_path
+        self.grid_lats = _as_coords(lats)
+        self._grid_bounds = None
 
 
 
@@ -3,12 +3,22 @@ Author: Matt Nicholson
 
 Functions that assist in processing MRMS data for plotting
 """
+import mmap
+import os
 import numpy as np
+from os.path import join
 from pyproj import Geod
 import pyproj
 
 from grib import fetch_scans, get_grib_objs
 from mrmscomposite import MRMSComposite
+from mrmsbase import dequantize
+
+# Number of grid rows reduced at a time when building a composite
+COMP_BLOCK_ROWS = 64
+
+# Number of points sampled along a nearest-neighbor cross section
+CROSS_SECT_PTS = 1000
 
 
 
@@ -32,10 +42,8 @@ def get_cross_cubic(grb, point1, point2):
     zi : numpy nd array
         Array containing cross-section reflectivity
     """
-    lons = grb.grid_lons
-    lats = grb.grid_lats
+    min_lon, lon_range, max_lat, lat_range = grb.grid_bounds
 
-    x, y = np.meshgrid(lons, lats)
     z = grb.data
 
     # [(x1, y1), (x2, y2)]
@@ -43,23 +51,38 @@ def get_cross_cubic(grb, point1, point2):
 
     # cubic interpolation
     y_world, x_world = np.array(list(zip(*line)))
-    col = z.shape[1] * (x_world - x.min()) / x.ptp()
-    row = z.shape[0] * (y.max() - y_world ) / y.ptp()
+    col = z.shape[1] * (x_world - min_lon) / lon_range
+    row = z.shape[0] * (max_lat - y_world ) / lat_range
 
     num = 100
-    row, col = [np.linspace(item[0], item[1], num) for item in [row, col]]
+    row = np.linspace(row[0], row[1], num)
+    col = np.linspace(col[0], col[1], num)
 
     valid_date = grb.validity_date
     valid_time = grb.validity_time
 
-    # Extract the values along the line, using cubic interpolation
-    zi = scipy.ndimage.map_coordinates(z, np.vstack((row, col)), order=1, mode='nearest')
+    # Extract the values along the line, using linear interpolation between the
+    # 4 surrounding gridpoints. Points off the grid take the value of the
+    # nearest edge gridpoint
+    row = np.clip(row, 0, z.shape[0] - 1)
+    col = np.clip(col, 0, z.shape[1] - 1)
+
+    row_0 = np.floor(row).astype(int)
+    col_0 = np.floor(col).astype(int)
+    row_1 = np.minimum(row_0 + 1, z.shape[0] - 1)
+    col_1 = np.minimum(col_0 + 1, z.shape[1] - 1)
+
+    row_wt = row - row_0
+    col_wt = col - col_0
+
+    zi = ((z[row_0, col_0] * (1 - col_wt) + z[row_0, col_1] * col_wt) * (1 - row_wt) +
+          (z[row_1, col_0] * (1 - col_wt) + z[row_1, col_1] * col_wt) * row_wt)
 
     return zi
 
 
 
-def get_cross_neighbor(grb, point1, point2):
+def get_cross_neighbor(grb, point1, point2, out=None, line_idx=None):
     """
     Calculates the cross section of a single MRMSGrib object's data from point1 to point2
     using nearest-neighbor interpolation
@@ -73,40 +96,94 @@ def get_cross_neighbor(grb, point1, point2):
     point2 : tuple of float
         Coordinates of the second point that defined the cross section
         Format: (lat, lon)
+    out : numpy 1d array, optional
+        Array to write the cross-section reflectivity to
+    line_idx : numpy 1d array of int, optional
+        Flat indices of the gridpoints to sample, as returned by _line_indices.
+        The indices only depend on the grid & the cross section endpoints, so
+        they can be computed once & reused for every scan on the same grid
 
     Returns
     -------
     zi : numpy nd array
         Array containing cross-section reflectivity
     """
-    lons = grb.grid_lons
-    lats = grb.grid_lats
+    if (line_idx is None):
+        line_idx = _line_indices(grb, point1, point2, CROSS_SECT_PTS)
 
-    x, y = np.meshgrid(lons, lats)
+    valid_date = grb.validity_date
+    valid_time = grb.validity_time
+
+    d_lats, d_lons = calc_geod_pts(point1, point2, len(line_idx))
 
-    # Read the MRMS reflectivity data from the grib object's memory-mapped array
-    z = np.memmap(grb.get_data_path(), dtype='float32', mode='r', shape=grb.shape)
+    # Sample the points along the line in order to get the reflectivity values
+    zi = _sample_scan(grb, line_idx, out=out)
+
+    return (zi, d_lats, d_lons)
+
+
+
+def _line_indices(grb, point1, point2, num):
+    """
+    Computes the flat indices of the gridpoints nearest to evenly-spaced points
+    along the line defined by point1 & point2
+
+    Parameters
+    ----------
+    grb : MRMSGrib object
+    point1 : tuple of float
+        Format: (lat, lon)
+    point2 : tuple of float
+        Format: (lat, lon)
+    num : int
+        Number of points to sample
+
+    Returns
+    -------
+    numpy 1d array of int
+    """
+    min_lon, lon_range, max_lat, lat_range = grb.grid_bounds
 
     # Calculate the coordinates of a line defined by point1 & point2 to sample
     line = [(point1[0], point1[1]), (point2[0], point2[1])]
 
     y_world, x_world = np.array(list(zip(*line)))
 
-    col = z.shape[1] * (x_world - x.min()) / x.ptp()
-    row = z.shape[0] * (y.max() - y_world ) / y.ptp()
+    col = grb.shape[1] * (x_world - min_lon) / lon_range
+    row = grb.shape[0] * (max_lat - y_world ) / lat_range
 
-    num = 1000
-    row, col = [np.linspace(item[0], item[1], num) for item in [row, col]]
+    # Indices are truncated to integers by linspace itself, no float copy needed
+    row_idx = np.linspace(row[0], row[1], num, dtype=np.intp)
+    col_idx = np.linspace(col[0], col[1], num, dtype=np.intp)
 
-    valid_date = grb.validity_date
-    valid_time = grb.validity_time
+    return np.ravel_multi_index((row_idx, col_idx), grb.shape)
 
-    d_lats, d_lons = calc_coords(point1, point2, num)
 
-    # Sample the points along the line in order to get the reflectivity values
-    zi = z[row.astype(int), col.astype(int)]
 
-    return (zi, d_lats, d_lons)
+def _sample_scan(grb, line_idx, out=None):
+    """
+    Samples a MRMSGrib object's data at the given flat indices
+
+    Parameters
+    ----------
+    grb : MRMSGrib object
+    line_idx : numpy 1d array of int
+        Flat indices of the gridpoints to sample
+    out : numpy 1d array, optional
+        Array to write the sampled values to
+
+    Returns
+    -------
+    numpy 1d array
+    """
+    # Read the MRMS reflectivity data from the grib object's memory-mapped array.
+    # Quantized data is only dequantized after the points have been sampled
+    z = grb.raw_data
+
+    if (grb.quantized):
+        return dequantize(np.take(z, line_idx), out=out)
+
+    return np.take(z, line_idx, out=out)
 
 
 
@@ -133,16 +210,21 @@ def process_slice(base_path, slice_time, point1, point2):
     Tuple of (numpy array, list, list)
         Contains the cross section array, lats, and lons
     """
-    cross_sections = np.array([])
-
     scans = fetch_scans(base_path, slice_time) # z = 33
     grbs = get_grib_objs(scans, base_path, point1, point2)
 
-    cross_sections, lats, lons = np.asarray(get_cross_neighbor(grbs[0], point1, point2))
+    # Every scan is on the same grid, so the sample indices are only computed once
+    line_idx = _line_indices(grbs[0], point1, point2, CROSS_SECT_PTS)
+
+    x_sect, lats, lons = get_cross_neighbor(grbs[0], point1, point2, line_idx=line_idx)
 
-    for grb in grbs[1:]:
-        x_sect, _, _ = get_cross_neighbor(grb, point1, point2)
-        cross_sections = np.vstack((cross_sections, x_sect))
+    # One row per scan angle
+    cross_sections = np.empty((len(grbs), len(x_sect)), dtype=np.float32)
+    cross_sections[0] = x_sect
+
+    # Each scan's samples are gathered straight into its row
+    for idx, grb in enumerate(grbs[1:], start=1):
+        _sample_scan(grb, line_idx, out=cross_sections[idx])
 
     return (cross_sections, lats, lons)
 
@@ -150,7 +232,38 @@ def process_slice(base_path, slice_time, point1, point2):
 
 def calc_geod_pts(point1, point2, num_pts):
     """
-    Calculates a number of points, num_pts, along a line defined by point1 & point2
+    Calculates a number of points, num_pts, along a line defined by point1 & point2.
+    The points are linearly interpolated in lat/lon space, which differs from
+    the geodesic by much less than a MRMS gridpoint over cross-section lengths.
+    Use calc_geod_pts_geodesic for long lines
+
+    Parameters
+    ----------
+    point1 : tuple of floats
+        First geographic coordinate pair
+        Format: (lat, lon)
+    point2 : tuple of floats
+        Second geographic coordinate pair
+        Format: (lat, lon)
+    num_pts : int
+        Number of coordinate pairs to calculate
+
+    Returns
+    -------
+    Tuple of numpy 1d arrays of float
+        Format: (lats, lons)
+    """
+    lats = np.linspace(point1[0], point2[0], num_pts)
+    lons = np.linspace(point1[1], point2[1], num_pts)
+
+    return (lats, lons)
+
+
+
+def calc_geod_pts_geodesic(point1, point2, num_pts):
+    """
+    Calculates a number of points, num_pts, along the geodesic defined by
+    point1 & point2
 
     Parameters
     ----------
@@ -177,7 +290,7 @@ def calc_geod_pts(point1, point2, num_pts):
 
 
 
-def get_composite_ref(base_path, slice_time, point1, point2, memmap_path):
+def get_composite_ref(base_path, slice_time, point1, point2, memmap_path, quantized=False):
     """
     Creates a composite reflectivity product from the 33 MRMS scan angles
 
@@ -195,6 +308,11 @@ def get_composite_ref(base_path, slice_time, point1, point2, memmap_path):
         Format: (lat, lon)
     memmap_path : str
         Path to the directory being used to store memory-mapped array files
+    quantized : bool, optional
+        If True, the scans & composite are stored as uint8 quantized
+        reflectivity. Quantization is monotonic, so the composite is computed
+        directly on the quantized arrays, moving a quarter of the bytes.
+        Default is False
 
     Returns
     -------
@@ -202,7 +320,8 @@ def get_composite_ref(base_path, slice_time, point1, point2, memmap_path):
     """
     scans = fetch_scans(base_path, slice_time)
 
-    grbs = get_grib_objs(scans, base_path, point1, point2)
+    grbs = get_grib_objs(scans, base_path, point1, point2, mem_path=memmap_path,
+                         quantized=quantized)
 
     valid_date = grbs[0].validity_date
     valid_time = grbs[0].validity_time
@@ -210,33 +329,70 @@ def get_composite_ref(base_path, slice_time, point1, point2, memmap_path):
     minor_axis = grbs[0].minor_axis
     data_shape = grbs[0].shape
 
-    fname = 'mrms-cross-{}-{}z.txt'.format(valid_date, valid_time)
+    fname = '{}-{}-{}'.format('comp_ref', valid_date, valid_time)
+    outpath = join(memmap_path, fname)
+
+    scans_mm = [grb.raw_data for grb in grbs]
 
-    scan_0 = np.memmap(grbs[0].get_data_path(), dtype='float32', mode='r', shape=grbs[0].shape)
-    composite = np.empty_like(scan_0)
-    composite[:] = scan_0
+    # Every scan is read front to back exactly once, so have the kernel read
+    # ahead aggressively rather than faulting in the default ~128 KB at a time
+    for scan_mm in scans_mm:
+        _advise_sequential(scan_mm)
 
-    del scan_0
+    # Accumulate the composite directly in its output memmap array
+    composite = np.memmap(outpath, dtype=grbs[0].data_dtype, mode='w+', shape=data_shape)
 
-    for grb in grbs[1:]:
-        curr_ref = np.memmap(grb.get_data_path(), dtype='float32', mode='r', shape=grb.shape)
+    # Reduce the scans one block of rows at a time so the block of the
+    # composite being updated stays in cache across all of the scans
+    for y0 in range(0, data_shape[0], COMP_BLOCK_ROWS):
+        block = composite[y0 : y0 + COMP_BLOCK_ROWS]
+        np.copyto(block, scans_mm[0][y0 : y0 + COMP_BLOCK_ROWS])
 
-        for idx, val in enumerate(composite):
-            for sub_idx, sub_val in enumerate(val):
-                if (curr_ref[idx][sub_idx] > composite[idx][sub_idx]):
-                    composite[idx][sub_idx] = curr_ref[idx][sub_idx]
-        del curr_ref
+        for curr_ref in scans_mm[1:]:
+            np.maximum(block, curr_ref[y0 : y0 + COMP_BLOCK_ROWS], out=block)
 
-    fname = '{}-{}-{}'.format('comp_ref', valid_date, valid_time)
-    outpath = join(memmap_path, fname)
+    del scans_mm
 
-    # write the composite data to memmap array
-    fp = np.memmap(outpath, dtype='float32', mode='w+', shape=data_shape)
-    fp[:] = composite[:]
-    del fp
+    composite.flush()
+    del composite
 
     comp_obj = MRMSComposite(valid_date, valid_time, major_axis, minor_axis,
                              outpath, fname, data_shape, grid_lons=grbs[0].grid_lons,
-                             grid_lats=grbs[0].grid_lats)
+                             grid_lats=grbs[0].grid_lats, quantized=quantized)
 
     return comp_obj
+
+
+
+def _advise_sequential(mm):
+    """
+    Advises the kernel that a memory-mapped array will be read sequentially
+    & in its entirety soon, so that readahead of the next pages overlaps with
+    the computation on the current ones. madvise is used where the mmap module
+    supports it (Python 3.8+), otherwise posix_fadvise is called on the
+    underlying file. This is a no-op on platforms supporting neither
+
+    Parameters
+    ----------
+    mm : numpy memmap
+
+    Returns
+    -------
+    None
+    """
+    raw_mmap = getattr(mm, '_mmap', None)
+
+    if (raw_mmap is not None and hasattr(raw_mmap, 'madvise')):
+        raw_mmap.madvise(mmap.MADV_SEQUENTIAL)
+        raw_mmap.madvise(mmap.MADV_WILLNEED)
+        return
+
+    if (not hasattr(os, 'posix_fadvise') or mm.filename is None):
+        return
+
+    fd = os.open(mm.filename, os.O_RDONLY)
+    try:
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+    finally:
+        os.close(fd)
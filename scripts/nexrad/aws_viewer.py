@@ -1,12 +1,13 @@
 import nexradaws
 from datetime import datetime
+from functools import lru_cache
 
 conn = nexradaws.NexradAwsInterface()
 
 def get_years(conn):
     print('\n')
     print('Available years: ')
-    years = conn.get_avail_years()
+    years = list(_avail_years(conn))
     for x in years:
         print(x)
     print('\n')
@@ -18,7 +19,7 @@ def get_years(conn):
 def get_months(conn, year):
     print('\n')
     print('Available months for {}: '.format(year))
-    months = conn.get_avail_months(year)
+    months = list(_avail_months(conn, year))
     for x in months:
         print(x)
     print('\n')
@@ -29,8 +30,8 @@ def get_months(conn, year):
 
 def print_days(conn, month, year):
     print('\n')
-    print('Days available for month: {}, year: {}'.format(month, day))
-    days = conn.get_avail_days(year, month)
+    print('Days available for month: {}, year: {}'.format(month, year))
+    days = list(_avail_days(conn, year, month))
     for x in days:
         print(x)
     print('\n')
@@ -41,8 +42,8 @@ def print_days(conn, month, year):
 
 def get_radars(conn, day, month, year):
     print('\n')
-    print('Radars available for day: {}, month: {}, year: {}')
-    radars = conn.get_avail_radars('2013','05','31')
+    print('Radars available for day: {}, month: {}, year: {}'.format(day, month, year))
+    radars = list(_avail_radars(conn, year, month, day))
     for x in radars:
         print(x)
     print('\n')
@@ -52,7 +53,7 @@ def get_radars(conn, day, month, year):
 
 
 def avail_scans(conn, day, month, year, site):
-    availscans = conn.get_avail_scans(year, month, day, site)
+    availscans = list(_avail_scans(conn, year, month, day, site))
     print('\n')
     print("There are {} NEXRAD files available for {}/{}/{} for the {} radar.\n".format(len(availscans), month, day, year, site))
     print('\n')
@@ -98,3 +99,40 @@ def download_files(conn, nexrad_objs, out_path):
         print ("{} volume scan time {}".format(scan.radar_id,scan.scan_time))
 
     return results
+
+
+
+################################################################################
+############################### Helper Functions ###############################
+################################################################################
+
+# Each of these lists an S3 bucket prefix, which doesn't change between calls,
+# so the results are cached to avoid repeating the round-trip to AWS
+
+@lru_cache(maxsize=256)
+def _avail_years(conn):
+    return tuple(conn.get_avail_years())
+
+
+
+@lru_cache(maxsize=256)
+def _avail_months(conn, year):
+    return tuple(conn.get_avail_months(year))
+
+
+
+@lru_cache(maxsize=256)
+def _avail_days(conn, year, month):
+    return tuple(conn.get_avail_days(year, month))
+
+
+
+@lru_cache(maxsize=256)
+def _avail_radars(conn, year, month, day):
+    return tuple(conn.get_avail_radars(year, month, day))
+
+
+
+@lru_cache(maxsize=256)
+def _avail_scans(conn, year, month, day, site):
+    return tuple(conn.get_avail_scans(year, month, day, site))
@@ -17,7 +17,7 @@ DATA_PATH = '/media/mnichol3/pmeyers1/MattNicholson/nexrad'
 fname = 'KAMA_SDUS54_N0RAMA_201905232102'
 fpath = join(DATA_PATH, fname)
 
-radar = pyart.io.read(fpath)
+radar = pyart.io.read_nexrad_level3(fpath)
 
 fout = fpath + '.nc'
 
@@ -7,7 +7,7 @@ DATA_PATH = '/media/mnichol3/pmeyers1/MattNicholson/nexrad'
 fname = 'KAMA20190523_210747_V06'
 fpath = join(DATA_PATH, fname)
 
-radar = pyart.io.read(fpath)
+radar = pyart.io.read_nexrad_archive(fpath)
 xsect = pyart.util.cross_section_ppi(radar, [35.09])
 
 display = pyart.graph.RadarDisplay(xsect)
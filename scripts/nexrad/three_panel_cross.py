@@ -17,7 +17,7 @@ DATA_PATH = '/media/mnichol3/pmeyers1/MattNicholson/nexrad'
 fname = 'KAMA20190523_210747_V06.nc'
 fpath = join(DATA_PATH, fname)
 
-radar = pyart.io.read(fpath)
+radar = pyart.io.read_cfradial(fpath)
 display = pyart.graph.GridMapDisplay(radar)
 
 # Setting projection, figure size, and panel sizes.
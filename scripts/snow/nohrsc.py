@@ -6,11 +6,34 @@ This file holds functions to download National Snowfall analysis files from
 the National Weather Service National Operational Hydrologic Remote Sensing
 Center (NOHRSC)
 """
-from datetime import datetime
-from os.path import join, isdir
-from os import makedirs, getcwd, listdir, remove
+from datetime import datetime, timedelta
+from os.path import join, isfile, getmtime, getsize, expanduser, dirname
+from os import makedirs, getcwd, listdir, remove, replace
+from threading import Lock
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from email.utils import formatdate
 import argparse
-import wget
+import json
+import requests
+from requests.adapters import HTTPAdapter
+
+# Max number of concurrent downloads made by download_many
+DL_WORKERS = 8
+
+# Size, in bytes, of the chunks downloaded files are written to disk in
+DL_CHUNK_SIZE = 1 << 20
+
+# Seconds to wait for the server to respond or send more data before a
+# download is abandoned
+DL_TIMEOUT = 60
+
+# Index of the ETag & Last-Modified headers & the size of previously
+# downloaded files, keyed by url. Used to skip re-downloading files that
+# haven't changed
+DL_CACHE_INDEX = join(expanduser('~'), '.cache', 'nohrsc', 'index.json')
+
+_CACHE_INDEX_LOCK = Lock()
 
 
 
@@ -29,8 +52,12 @@ def create_arg_parser():
     Arguments
         -d, --date (str)
             Date to fetch files for. Format: YYYY-MM-DD-HH
-        -p, --period (int)
+            A range of dates may be given as START:END, in which case every
+            analysis valid between the two dates (inclusive) is downloaded
+        -p, --period (int, one or more)
             Accumulation period, i.e. 6-hr, 24-hr, 48-hr, 72-hr, season.
+            Several periods may be given to download them all in one run
+            (stored as 'periods', with the first also stored as 'period').
             Valid args:
                 6 : 6-hr accumulation
                 24 : 24-hr accumulation
@@ -60,10 +87,11 @@ def create_arg_parser():
 
     parser.add_argument('-d', '--date', metavar='date', required=True,
                         dest='date', action='store', type=str, default=None,
-                        help='Date of snowfall analysis')
+                        help='Date of snowfall analysis, or a START:END range of dates')
 
     parser.add_argument('-p', '--period', metavar='period', required=True,
-                        dest='period', action='store', type=int, default=None,
+                        dest='period', action=_PeriodsAction, type=int,
+                        nargs='+', default=None,
                         help=('Period of snowfall accumulation (6: 6-hr, 24: 24-hr, '
                               '48: 48-hr, 72: 72-hr, 99: Season total)'))
 
@@ -102,16 +130,27 @@ def parse_url(cmd_args, f_name=None):
         https://www.nohrsc.noaa.gov/snowfall/data/201912/sfav2_CONUS_6h_2019121518.nc
         https://www.nohrsc.noaa.gov/snowfall/data/201912/sfav2_CONUS_2019093012_to_2019121512.png
     """
-    base_url = 'https://www.nohrsc.noaa.gov/snowfall/data'
+    if (not f_name):
+        return _url(cmd_args.date, cmd_args.period, cmd_args.f_type)
 
-    path_date = _get_path_date(cmd_args)
+    return _join_url(_get_path_date(cmd_args), f_name)
 
-    if (not f_name):
-        f_name = parse_fname(cmd_args)
 
-    url = '{}/{}/{}'.format(base_url, path_date, f_name)
 
-    return url
+@lru_cache(maxsize=1024)
+def _url(date_str, period, f_type):
+    """
+    Cached implementation of parse_url. Takes plain arguments rather than the
+    argparse Namespace so that date sweeps only build each url once
+    """
+    return _join_url(_path_date(date_str, None), _fname(date_str, period, f_type))
+
+
+
+def _join_url(path_date, f_name):
+    base_url = 'https://www.nohrsc.noaa.gov/snowfall/data'
+
+    return '{}/{}/{}'.format(base_url, path_date, f_name)
 
 
 
@@ -134,12 +173,21 @@ def parse_fname(cmd_args):
     Ex seasonal accumulation fname:
         sfav2_CONUS_2018093012_to_2018121512.nc
     """
+    return _fname(cmd_args.date, cmd_args.period, cmd_args.f_type)
+
+
 
+@lru_cache(maxsize=1024)
+def _fname(date_str, period, f_type):
+    """
+    Cached implementation of parse_fname. Takes plain arguments rather than
+    the argparse Namespace so the results can be memoized
+    """
     # Seasonal accumulation file
-    if (cmd_args.period == 99):
-        f_name = _parse_fname_season(cmd_args)
+    if (period == 99):
+        f_name = _parse_fname_season(date_str, f_type)
     else:
-        f_name = _parse_fname_hour(cmd_args)
+        f_name = _parse_fname_hour(date_str, period, f_type)
 
     return f_name
 
@@ -158,31 +206,38 @@ def adjust_date(cmd_args):
     -------
     date_in : datetime object
     """
-    valid_times_6 = [0, 6, 12, 18]
-    valid_times_24 = [0, 12]
+    return _adjust_date(cmd_args.date, cmd_args.period)
+
 
-    date_in = datetime.strptime(cmd_args.date, '%Y-%m-%d-%H')
 
-    if (cmd_args.period == 99):
+@lru_cache(maxsize=256)
+def _adjust_date(date_str, period):
+    """
+    Cached implementation of adjust_date. Takes the date string & accumulation
+    period rather than the argparse Namespace so the results can be memoized
+    """
+    date_in = _parse_date(date_str)
+
+    if (period == 99):
         """
         Seasonal accumulation
         Set the ending hour to 12z and decrement the day, if necessary
         """
         if (date_in.hour < 12):
-            date_in = date_in.replace(day = date_in.day - 1)
+            date_in -= timedelta(days=1)
         date_in = date_in.replace(hour = 12)
-    elif (cmd_args.period == 6):
+    elif (period == 6):
         """
         6-hr accumulation
         Set the hour to the previous synoptic time if necessary
         """
-        if (date_in.hour not in valid_times_6):
-            new_hr = max([i for i in valid_times_6 if date_in.hour > i])
-            date_in = date_in.replace(hour = new_hr)
+        date_in = date_in.replace(hour = (date_in.hour // 6) * 6)
     else:
-        if (date_in.hour not in valid_times_24):
-            new_hr = max([i for i in valid_times_24 if date_in.hour > i])
-            date_in = date_in.replace(hour = new_hr)
+        """
+        24-, 48-, & 72-hr accumulation
+        Set the hour to the previous 00z or 12z if necessary
+        """
+        date_in = date_in.replace(hour = (date_in.hour // 12) * 12)
 
     return date_in
 
@@ -209,7 +264,95 @@ def download(cmd_args):
 
     target_url = parse_url(cmd_args, f_name = target_fname)
 
-    wget.download(target_url, out_path)
+    # If we already have a complete copy of the file, only download it again
+    # if it has changed
+    headers = _cache_headers(target_url, out_path)
+
+    with _get_session().get(target_url, headers=headers, stream=True,
+                            timeout=DL_TIMEOUT) as resp:
+        resp.raise_for_status()
+
+        if (resp.status_code == 304):
+            print('{} is up to date, skipping'.format(target_fname))
+        else:
+            # Stream the file to disk rather than holding all of it in memory.
+            # It's written to a temp file that is only moved into place once
+            # complete, so a failed download never leaves a truncated file
+            # at out_path
+            part_path = out_path + '.part'
+            try:
+                with open(part_path, 'wb') as f_out:
+                    for chunk in resp.iter_content(chunk_size=DL_CHUNK_SIZE):
+                        f_out.write(chunk)
+
+                # The old entry stops describing the file at out_path as soon
+                # as it is replaced
+                _update_cache_index(target_url)
+                replace(part_path, out_path)
+            except BaseException:
+                if (isfile(part_path)):
+                    remove(part_path)
+                raise
+
+            _update_cache_index(target_url, out_path, resp.headers.get('ETag'),
+                                resp.headers.get('Last-Modified'), getsize(out_path))
+
+    return out_path
+
+
+
+def download_periods(cmd_args):
+    """
+    Download the snow analysis files for every accumulation period & date
+    given on the command line. The downloads share one session & run
+    concurrently
+
+    Parameters
+    ----------
+    cmd_args : argparse.Namespace obj
+        Parsed command line arguments
+
+    Return
+    ------
+    f_paths : list of str
+        Absolute paths of the downloaded files
+    """
+    periods = getattr(cmd_args, 'periods', None) or [cmd_args.period]
+
+    cmd_args_list = []
+    for period in periods:
+        for date_str in _expand_dates(cmd_args.date, period):
+            curr_args = argparse.Namespace(**vars(cmd_args))
+            curr_args.date = date_str
+            curr_args.period = period
+            curr_args.periods = [period]
+            cmd_args_list.append(curr_args)
+
+    return download_many(cmd_args_list)
+
+
+
+def download_many(cmd_args_list):
+    """
+    Download several snow analysis files from NOHRSC concurrently
+
+    Parameters
+    ----------
+    cmd_args_list : list of argparse.Namespace obj
+        Parsed command line arguments, one per file to download
+
+    Return
+    ------
+    f_paths : list of str
+        Absolute paths of the downloaded files
+    """
+    if (not cmd_args_list):
+        return []
+
+    with ThreadPoolExecutor(max_workers=min(len(cmd_args_list), DL_WORKERS)) as executor:
+        f_paths = list(executor.map(download, cmd_args_list))
+
+    return f_paths
 
 
 
@@ -218,6 +361,17 @@ def download(cmd_args):
 ################################################################################
 
 
+class _PeriodsAction(argparse.Action):
+    """
+    Stores all of the accumulation periods passed to -p as 'periods', and the
+    first one as 'period' so single-period callers are unaffected
+    """
+    def __call__(self, parser, namespace, values, option_string=None):
+        setattr(namespace, 'periods', list(values))
+        setattr(namespace, self.dest, values[0])
+
+
+
 def check_ftype(cmd_args):
     """
     Check that the file type & accumulation period combination is valid
@@ -229,35 +383,177 @@ def check_ftype(cmd_args):
 
 
 
+@lru_cache(maxsize=1)
+def _get_session():
+    """
+    Create the requests Session shared by all downloads, so that connections
+    to the NOHRSC server (and their TLS handshakes) are reused
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=DL_WORKERS, pool_maxsize=DL_WORKERS)
+    session.mount('https://', adapter)
+
+    return session
+
+
+
+def _read_cache_index():
+    """
+    Read the download cache index. Returns an empty dict if the index doesn't
+    exist or can't be read
+    """
+    try:
+        with open(DL_CACHE_INDEX, 'r') as f_in:
+            return json.load(f_in)
+    except (OSError, ValueError):
+        return {}
+
+
+
+def _update_cache_index(url, f_path=None, etag=None, last_modified=None, size=None):
+    """
+    Record the ETag & Last-Modified headers & the size of a downloaded file in
+    the cache index. If neither header is given, the url's entry is removed.
+    The index is rewritten to a temp file & swapped in with os.replace so that
+    an interrupted write never leaves it corrupted
+    """
+    with _CACHE_INDEX_LOCK:
+        index = _read_cache_index()
+
+        if (etag is None and last_modified is None):
+            if (index.pop(url, None) is None):
+                return
+        else:
+            index[url] = {'path': f_path, 'etag': etag, 'last_modified': last_modified,
+                          'size': size}
+
+        _make_dirs(dirname(DL_CACHE_INDEX))
+        tmp_path = DL_CACHE_INDEX + '.tmp'
+        with open(tmp_path, 'w') as f_out:
+            json.dump(index, f_out)
+        replace(tmp_path, DL_CACHE_INDEX)
+
+
+
+def _cache_headers(url, f_path):
+    """
+    Build the conditional request headers for a file that has already been
+    downloaded. The headers are only sent if the cache index recorded the
+    file at f_path & it still has the size that was recorded when its download
+    completed, otherwise the entry is dropped & the file is downloaded again
+
+    Parameters
+    ----------
+    url : str
+    f_path : str
+        Absolute path the file is downloaded to
+
+    Return
+    ------
+    headers : dict
+    """
+    headers = {}
+    cache_entry = _read_cache_index().get(url)
+
+    if (cache_entry is None):
+        return headers
+
+    if (cache_entry.get('path') != f_path or not isfile(f_path) or
+            cache_entry.get('size') != getsize(f_path)):
+        _update_cache_index(url)
+        return headers
+
+    if (cache_entry.get('etag')):
+        headers['If-None-Match'] = cache_entry['etag']
+    headers['If-Modified-Since'] = (cache_entry.get('last_modified') or
+                                    formatdate(getmtime(f_path), usegmt=True))
+
+    return headers
+
+
+
+def _parse_date(date_str):
+    """
+    Parse a YYYY-MM-DD-HH date string. The string is fixed-width, so it is
+    sliced rather than parsed with strptime
+    """
+    return datetime(int(date_str[:4]), int(date_str[5:7]), int(date_str[8:10]),
+                    int(date_str[11:13]))
+
+
+
+def _expand_dates(date_arg, period):
+    """
+    Expand a START:END date range into the valid time of every analysis file
+    for the given accumulation period within the range. A single date is
+    returned as-is
+
+    Parameters
+    ----------
+    date_arg : str
+        Format: YYYY-MM-DD-HH or YYYY-MM-DD-HH:YYYY-MM-DD-HH
+    period : int
+
+    Return
+    ------
+    list of str
+        Format: YYYY-MM-DD-HH
+    """
+    if (':' not in date_arg):
+        return [date_arg]
+
+    start_str, end_str = date_arg.split(':')
+
+    # 6-hr files are valid every 6 hours, seasonal files daily at 12z, and the
+    # 24-, 48-, & 72-hr files at 00z & 12z
+    step = timedelta(hours={6: 6, 99: 24}.get(period, 12))
+
+    # Start at the first valid time at or after the start of the range
+    start = _adjust_date(start_str, period)
+    if (start < _parse_date(start_str)):
+        start += step
+    end = _adjust_date(end_str, period)
+
+    dates = []
+    curr = start
+    while (curr <= end):
+        dates.append(f'{curr.year:04d}-{curr.month:02d}-{curr.day:02d}-{curr.hour:02d}')
+        curr += step
+
+    return dates
+
+
+
 def _get_path_date(cmd_args, delim=None):
-    date_in = datetime.strptime(cmd_args.date, '%Y-%m-%d-%H')
-    if (delim is not None):
-        if (not isinstance(delim, str)):
-            raise ValueError('Delimiter argument must be of type str')
-        pattern = '%Y{}%m'.format(delim)
-    else:
-        pattern = '%Y%m'
-    path_date = date_in.strftime(pattern)
+    if (delim is not None and not isinstance(delim, str)):
+        raise ValueError('Delimiter argument must be of type str')
+    return _path_date(cmd_args.date, delim)
+
+
+
+@lru_cache(maxsize=256)
+def _path_date(date_str, delim):
+    if (delim is None):
+        delim = ''
+    path_date = f'{date_str[:4]}{delim}{date_str[5:7]}'
     return path_date
 
 
 
-def _parse_fname_season(cmd_args):
+def _parse_fname_season(date_str, f_type):
     """
     Parse the filename for a seasonal-accumulation file
 
     Ex seasonal accumulation fname: sfav2_CONUS_2018093012_to_2018121512.nc
     """
-    f_name_base = 'sfav2_CONUS_{}_to_{}'
     season_start = '093012'     # Start month, day, & hour for seasonal accum
 
-    date_in = adjust_date(cmd_args)
+    date_in = _adjust_date(date_str, 99)
 
-    if (not check_ftype(cmd_args)):
-        print('{} not valid for seasonal accumulation period. Downloading as NetCDF'.format(cmd_args.f_type))
+    # GRIB files aren't available for the seasonal accumulation (see check_ftype)
+    if (f_type == 'grib'):
+        print('{} not valid for seasonal accumulation period. Downloading as NetCDF'.format(f_type))
         f_type = 'nc'
-    else:
-        f_type = cmd_args.f_type
 
     # If we are in the new year of the winter season (i.e., Jan 2020 of the
     # 2019-2020 winter season), adjust the start year defining the winter season
@@ -266,33 +562,35 @@ def _parse_fname_season(cmd_args):
     else:
         start_yr = date_in.year
 
-    date_start = '{}{}'.format(start_yr, season_start)
-    date_end = datetime.strftime(date_in, '%Y%m%d%H')
-
-    f_name = f_name_base.format(date_start, date_end)
+    date_end = _fmt_valid_date(date_in)
 
-    f_name = '{}.{}'.format(f_name, f_type)
+    f_name = f'sfav2_CONUS_{start_yr}{season_start}_to_{date_end}.{f_type}'
 
     return f_name
 
 
 
-def _parse_fname_hour(cmd_args):
+def _parse_fname_hour(date_str, period, f_type):
     """
     Parse the filename for a 6-, 24-, 48-, or 72-hour accumulation file
 
     Ex fname: sfav2_CONUS_6h_2019121518.nc
     """
-    f_name_base = 'sfav2_CONUS_{}h_{}'
+    date_in = _adjust_date(date_str, period)
+    valid_date = _fmt_valid_date(date_in)
 
-    date_in = adjust_date(cmd_args)
-    valid_date = date_in.strftime('%Y%m%d%H')
+    f_name = f'sfav2_CONUS_{period}h_{valid_date}.{f_type}'
 
-    f_name = f_name_base.format(cmd_args.period, valid_date)
+    return f_name
 
-    f_name = '{}.{}'.format(f_name, cmd_args.f_type)
 
-    return f_name
+
+def _fmt_valid_date(date_in):
+    """
+    Format a datetime as YYYYMMDDHH. Built from the datetime's fields directly,
+    as strftime goes through the C library's locale-aware formatting
+    """
+    return f'{date_in.year:04d}{date_in.month:02d}{date_in.day:02d}{date_in.hour:02d}'
 
 
 
@@ -302,12 +600,19 @@ def _validate_outpath(cmd_args):
         dirs = join(cmd_args.out_path, 'snowfall', dir_date)
     else:
         dirs = cmd_args.out_path
-    if (not isdir(dirs)):
-        makedirs(dirs)
+    _make_dirs(dirs)
     return dirs
 
 
 
+def _make_dirs(dirs):
+    """
+    Create a directory, and any missing parents, if it doesn't already exist
+    """
+    makedirs(dirs, exist_ok=True)
+
+
+
 def main():
 
     # Create a parser instance
@@ -316,7 +621,7 @@ def main():
     # Parse the command line argmuments. Returns an argparse.Namespace obj
     args = parser.parse_args()
 
-    download(args)
+    download_periods(args)
 
 
 
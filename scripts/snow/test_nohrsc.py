@@ -1,16 +1,48 @@
 import unittest
 import warnings
+import tempfile
 from datetime import datetime
+from os.path import join, isfile
+from unittest import mock
+import requests
 
 import nohrsc
 
+class _FakeResponse(object):
+    """
+    Stands in for a streamed requests.Response in the download tests. If
+    error is given, it is raised once all of the chunks have been yielded
+    """
+
+    def __init__(self, status_code, chunks=(), headers=None, error=None):
+        self.status_code = status_code
+        self.chunks = chunks
+        self.headers = headers or {}
+        self.error = error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def raise_for_status(self):
+        if (self.status_code >= 400):
+            raise requests.HTTPError(self.status_code)
+
+    def iter_content(self, chunk_size=None):
+        for chunk in self.chunks:
+            yield chunk
+        if (self.error is not None):
+            raise self.error
+
+
 class TestNOHRSC(unittest.TestCase):
 
-    # def setUp(self):
-    #     args = ['-d', '2019-12-06-15', '-p', '6', '-t', 'nc']
-    #
-    #     parser = nohrsc.create_arg_parser()
-    #     args = parser.parse_args(args)
+    @classmethod
+    def setUpClass(cls):
+        # parse_args doesn't modify the parser, so one instance is shared
+        cls.parser = nohrsc.create_arg_parser()
 
     ############################################################################
     ########################## Test adjust_date ################################
@@ -19,8 +51,7 @@ class TestNOHRSC(unittest.TestCase):
     def test_adjust_date_1(self):
         args_in = ['-d', '2019-12-06-18', '-p', '6', '-t', 'nc']
 
-        parser = nohrsc.create_arg_parser()
-        args = parser.parse_args(args_in)
+        args = self.parser.parse_args(args_in)
 
         date_adjusted = nohrsc.adjust_date(args)
         date_adjusted = datetime.strftime(date_adjusted, '%Y-%m-%d-%H')
@@ -31,8 +62,7 @@ class TestNOHRSC(unittest.TestCase):
     def test_adjust_date_2(self):
         args_in = ['-d', '2019-12-06-15', '-p', '6', '-t', 'nc']
 
-        parser = nohrsc.create_arg_parser()
-        args = parser.parse_args(args_in)
+        args = self.parser.parse_args(args_in)
 
         date_adjusted = nohrsc.adjust_date(args)
         date_adjusted = datetime.strftime(date_adjusted, '%Y-%m-%d-%H')
@@ -43,8 +73,7 @@ class TestNOHRSC(unittest.TestCase):
     def test_adjust_date_3(self):
         args_in = ['-d', '2019-12-06-00', '-p', '6', '-t', 'nc']
 
-        parser = nohrsc.create_arg_parser()
-        args = parser.parse_args(args_in)
+        args = self.parser.parse_args(args_in)
 
         date_adjusted = nohrsc.adjust_date(args)
         date_adjusted = datetime.strftime(date_adjusted, '%Y-%m-%d-%H')
@@ -55,8 +84,7 @@ class TestNOHRSC(unittest.TestCase):
     def test_adjust_date_4(self):
         args_in = ['-d', '2019-12-06-06', '-p', '24', '-t', 'nc']
 
-        parser = nohrsc.create_arg_parser()
-        args = parser.parse_args(args_in)
+        args = self.parser.parse_args(args_in)
 
         date_adjusted = nohrsc.adjust_date(args)
         date_adjusted = datetime.strftime(date_adjusted, '%Y-%m-%d-%H')
@@ -67,8 +95,7 @@ class TestNOHRSC(unittest.TestCase):
     def test_adjust_date_5(self):
         args_in = ['-d', '2019-12-06-13', '-p', '24', '-t', 'nc']
 
-        parser = nohrsc.create_arg_parser()
-        args = parser.parse_args(args_in)
+        args = self.parser.parse_args(args_in)
 
         date_adjusted = nohrsc.adjust_date(args)
         date_adjusted = datetime.strftime(date_adjusted, '%Y-%m-%d-%H')
@@ -79,8 +106,7 @@ class TestNOHRSC(unittest.TestCase):
     def test_adjust_date_6(self):
         args_in = ['-d', '2019-12-06-13', '-p', '99', '-t', 'nc']
 
-        parser = nohrsc.create_arg_parser()
-        args = parser.parse_args(args_in)
+        args = self.parser.parse_args(args_in)
 
         date_adjusted = nohrsc.adjust_date(args)
         date_adjusted = datetime.strftime(date_adjusted, '%Y-%m-%d-%H')
@@ -91,8 +117,7 @@ class TestNOHRSC(unittest.TestCase):
     def test_adjust_date_7(self):
         args_in = ['-d', '2019-12-06-04', '-p', '99', '-t', 'nc']
 
-        parser = nohrsc.create_arg_parser()
-        args = parser.parse_args(args_in)
+        args = self.parser.parse_args(args_in)
 
         date_adjusted = nohrsc.adjust_date(args)
         date_adjusted = datetime.strftime(date_adjusted, '%Y-%m-%d-%H')
@@ -100,6 +125,17 @@ class TestNOHRSC(unittest.TestCase):
 
 
 
+    def test_adjust_date_8(self):
+        args_in = ['-d', '2020-01-01-04', '-p', '99', '-t', 'nc']
+
+        args = self.parser.parse_args(args_in)
+
+        date_adjusted = nohrsc.adjust_date(args)
+        date_adjusted = datetime.strftime(date_adjusted, '%Y-%m-%d-%H')
+        self.assertEqual('2019-12-31-12', date_adjusted)
+
+
+
 
     ############################################################################
     ########################## Test parse_fname ################################
@@ -110,8 +146,7 @@ class TestNOHRSC(unittest.TestCase):
     def test_parse_fname_1(self):
         args_in = ['-d', '2019-12-06-18', '-p', '6', '-t', 'nc']
 
-        parser = nohrsc.create_arg_parser()
-        args = parser.parse_args(args_in)
+        args = self.parser.parse_args(args_in)
 
         f_name = nohrsc.parse_fname(args)
         f_name_actual = 'sfav2_CONUS_6h_2019120618.nc'
@@ -123,8 +158,7 @@ class TestNOHRSC(unittest.TestCase):
     def test_parse_fname_2(self):
         args_in = ['-d', '2019-12-06-21', '-p', '6', '-t', 'nc']
 
-        parser = nohrsc.create_arg_parser()
-        args = parser.parse_args(args_in)
+        args = self.parser.parse_args(args_in)
 
         f_name = nohrsc.parse_fname(args)
         f_name_actual = 'sfav2_CONUS_6h_2019120618.nc'
@@ -136,8 +170,7 @@ class TestNOHRSC(unittest.TestCase):
     def test_parse_fname_3(self):
         args_in = ['-d', '2019-12-06-00', '-p', '6', '-t', 'nc']
 
-        parser = nohrsc.create_arg_parser()
-        args = parser.parse_args(args_in)
+        args = self.parser.parse_args(args_in)
 
         f_name = nohrsc.parse_fname(args)
         f_name_actual = 'sfav2_CONUS_6h_2019120600.nc'
@@ -149,8 +182,7 @@ class TestNOHRSC(unittest.TestCase):
     def test_parse_fname_4(self):
         args_in = ['-d', '2019-12-06-21', '-p', '6', '-t', 'tif']
 
-        parser = nohrsc.create_arg_parser()
-        args = parser.parse_args(args_in)
+        args = self.parser.parse_args(args_in)
 
         f_name = nohrsc.parse_fname(args)
         f_name_actual = 'sfav2_CONUS_6h_2019120618.tif'
@@ -162,8 +194,7 @@ class TestNOHRSC(unittest.TestCase):
     def test_parse_fname_5(self):
         args_in = ['-d', '2019-12-15-21', '-p', '24', '-t', 'tif']
 
-        parser = nohrsc.create_arg_parser()
-        args = parser.parse_args(args_in)
+        args = self.parser.parse_args(args_in)
 
         f_name = nohrsc.parse_fname(args)
         f_name_actual = 'sfav2_CONUS_24h_2019121512.tif'
@@ -175,8 +206,7 @@ class TestNOHRSC(unittest.TestCase):
     def test_parse_fname_6(self):
         args_in = ['-d', '2019-12-15-21', '-p', '48', '-t', 'tif']
 
-        parser = nohrsc.create_arg_parser()
-        args = parser.parse_args(args_in)
+        args = self.parser.parse_args(args_in)
 
         f_name = nohrsc.parse_fname(args)
         f_name_actual = 'sfav2_CONUS_48h_2019121512.tif'
@@ -188,8 +218,7 @@ class TestNOHRSC(unittest.TestCase):
     def test_parse_fname_7(self):
         args_in = ['-d', '2019-12-15-21', '-p', '72', '-t', 'nc']
 
-        parser = nohrsc.create_arg_parser()
-        args = parser.parse_args(args_in)
+        args = self.parser.parse_args(args_in)
 
         f_name = nohrsc.parse_fname(args)
         f_name_actual = 'sfav2_CONUS_72h_2019121512.nc'
@@ -201,8 +230,7 @@ class TestNOHRSC(unittest.TestCase):
     def test_parse_fname_8(self):
         args_in = ['-d', '2019-12-15-21', '-p', '99', '-t', 'nc']
 
-        parser = nohrsc.create_arg_parser()
-        args = parser.parse_args(args_in)
+        args = self.parser.parse_args(args_in)
 
         f_name = nohrsc.parse_fname(args)
         f_name_actual = 'sfav2_CONUS_2019093012_to_2019121512.nc'
@@ -214,8 +242,7 @@ class TestNOHRSC(unittest.TestCase):
     def test_parse_fname_9(self):
         args_in = ['-d', '2018-12-15-18', '-p', '99', '-t', 'nc']
 
-        parser = nohrsc.create_arg_parser()
-        args = parser.parse_args(args_in)
+        args = self.parser.parse_args(args_in)
 
         f_name = nohrsc.parse_fname(args)
         f_name_actual = 'sfav2_CONUS_2018093012_to_2018121512.nc'
@@ -227,8 +254,7 @@ class TestNOHRSC(unittest.TestCase):
     def test_parse_fname_10(self):
         args_in = ['-d', '2019-12-15-06', '-p', '99', '-t', 'nc']
 
-        parser = nohrsc.create_arg_parser()
-        args = parser.parse_args(args_in)
+        args = self.parser.parse_args(args_in)
 
         f_name = nohrsc.parse_fname(args)
         f_name_actual = 'sfav2_CONUS_2019093012_to_2019121412.nc'
@@ -246,8 +272,7 @@ class TestNOHRSC(unittest.TestCase):
     def test_parse_url_1(self):
         args_in = ['-d', '2019-12-15-18', '-p', '6', '-t', 'nc']
 
-        parser = nohrsc.create_arg_parser()
-        args = parser.parse_args(args_in)
+        args = self.parser.parse_args(args_in)
 
         url = nohrsc.parse_url(args)
         url_actual = 'https://www.nohrsc.noaa.gov/snowfall/data/201912/sfav2_CONUS_6h_2019121518.nc'
@@ -259,8 +284,7 @@ class TestNOHRSC(unittest.TestCase):
     def test_parse_url_2(self):
         args_in = ['-d', '2019-12-15-18', '-p', '24', '-t', 'nc']
 
-        parser = nohrsc.create_arg_parser()
-        args = parser.parse_args(args_in)
+        args = self.parser.parse_args(args_in)
 
         url = nohrsc.parse_url(args)
         url_actual = 'https://www.nohrsc.noaa.gov/snowfall/data/201912/sfav2_CONUS_24h_2019121512.nc'
@@ -272,8 +296,7 @@ class TestNOHRSC(unittest.TestCase):
     def test_parse_url_3(self):
         args_in = ['-d', '2019-12-15-18', '-p', '99', '-t', 'nc']
 
-        parser = nohrsc.create_arg_parser()
-        args = parser.parse_args(args_in)
+        args = self.parser.parse_args(args_in)
 
         url = nohrsc.parse_url(args)
         url_actual = 'https://www.nohrsc.noaa.gov/snowfall/data/201912/sfav2_CONUS_2019093012_to_2019121512.nc'
@@ -285,8 +308,7 @@ class TestNOHRSC(unittest.TestCase):
     def test_parse_url_4(self):
         args_in = ['-d', '2019-12-15-06', '-p', '99', '-t', 'nc']
 
-        parser = nohrsc.create_arg_parser()
-        args = parser.parse_args(args_in)
+        args = self.parser.parse_args(args_in)
 
         url = nohrsc.parse_url(args)
         url_actual = 'https://www.nohrsc.noaa.gov/snowfall/data/201912/sfav2_CONUS_2019093012_to_2019121412.nc'
@@ -296,5 +318,189 @@ class TestNOHRSC(unittest.TestCase):
 
 
 
+    ############################################################################
+    ########################## Test multiple periods ###########################
+    ############################################################################
+
+    def test_periods_1(self):
+        args_in = ['-d', '2019-12-15-06', '-p', '6', '-t', 'nc']
+
+        args = self.parser.parse_args(args_in)
+
+        self.assertEqual(args.period, 6)
+        self.assertEqual(args.periods, [6])
+
+
+
+    def test_periods_2(self):
+        args_in = ['-d', '2019-12-15-06', '-p', '6', '24', '99', '-t', 'nc']
+
+        args = self.parser.parse_args(args_in)
+
+        self.assertEqual(args.period, 6)
+        self.assertEqual(args.periods, [6, 24, 99])
+
+
+
+
+    ############################################################################
+    ############################# Test download ################################
+    ############################################################################
+
+    DL_ARGS = ['-d', '2019-12-15-06', '-p', '6', '-t', 'nc']
+
+    def _out_path(self, out_dir):
+        """
+        Path that the test download is saved to
+        """
+        return join(out_dir, nohrsc.parse_fname(self.parser.parse_args(self.DL_ARGS)))
+
+
+
+    def _download(self, resp, out_dir):
+        """
+        Run download with a mocked session returning resp & the cache index
+        kept in out_dir. Returns the mocked session's get method
+        """
+        args = self.parser.parse_args(self.DL_ARGS + ['-o', out_dir])
+        session = mock.Mock()
+        session.get.return_value = resp
+
+        with mock.patch.object(nohrsc, '_get_session', return_value=session), \
+             mock.patch.object(nohrsc, 'DL_CACHE_INDEX', join(out_dir, 'index.json')), \
+             mock.patch('builtins.print'):
+            nohrsc.download(args)
+
+        return session.get
+
+
+
+    def test_download_1(self):
+        # A complete download is moved into place & no temp file is left
+        with tempfile.TemporaryDirectory() as out_dir:
+            resp = _FakeResponse(200, chunks=[b'abc', b'def'])
+            get = self._download(resp, out_dir)
+
+            out_path = self._out_path(out_dir)
+            with open(out_path, 'rb') as f_in:
+                self.assertEqual(f_in.read(), b'abcdef')
+            self.assertFalse(isfile(out_path + '.part'))
+            self.assertEqual(get.call_args[1]['timeout'], nohrsc.DL_TIMEOUT)
+
+
+
+    def test_download_2(self):
+        # A 304 response leaves the existing file untouched
+        with tempfile.TemporaryDirectory() as out_dir:
+            self._download(_FakeResponse(200, chunks=[b'old'],
+                                         headers={'ETag': '"v1"'}), out_dir)
+
+            get = self._download(_FakeResponse(304), out_dir)
+
+            out_path = self._out_path(out_dir)
+            with open(out_path, 'rb') as f_in:
+                self.assertEqual(f_in.read(), b'old')
+            self.assertEqual(get.call_args[1]['headers']['If-None-Match'], '"v1"')
+
+
+
+    def test_download_3(self):
+        # An interrupted stream leaves neither a truncated file nor a temp file
+        with tempfile.TemporaryDirectory() as out_dir:
+            resp = _FakeResponse(200, chunks=[b'abc'],
+                                 error=requests.exceptions.ChunkedEncodingError())
+
+            with self.assertRaises(requests.exceptions.ChunkedEncodingError):
+                self._download(resp, out_dir)
+
+            out_path = self._out_path(out_dir)
+            self.assertFalse(isfile(out_path))
+            self.assertFalse(isfile(out_path + '.part'))
+
+
+
+    def test_download_4(self):
+        # An interrupted stream keeps the previously downloaded file intact
+        with tempfile.TemporaryDirectory() as out_dir:
+            self._download(_FakeResponse(200, chunks=[b'old']), out_dir)
+
+            resp = _FakeResponse(200, chunks=[b'ne'],
+                                 error=requests.exceptions.ChunkedEncodingError())
+            with self.assertRaises(requests.exceptions.ChunkedEncodingError):
+                self._download(resp, out_dir)
+
+            out_path = self._out_path(out_dir)
+            with open(out_path, 'rb') as f_in:
+                self.assertEqual(f_in.read(), b'old')
+            self.assertFalse(isfile(out_path + '.part'))
+
+
+
+
+    def test_download_5(self):
+        # The recorded Last-Modified header is sent back as If-Modified-Since
+        with tempfile.TemporaryDirectory() as out_dir:
+            last_mod = 'Sun, 15 Dec 2019 06:00:00 GMT'
+            self._download(_FakeResponse(200, chunks=[b'old'],
+                                         headers={'Last-Modified': last_mod}), out_dir)
+
+            get = self._download(_FakeResponse(304), out_dir)
+
+            headers = get.call_args[1]['headers']
+            self.assertEqual(headers['If-Modified-Since'], last_mod)
+            self.assertNotIn('If-None-Match', headers)
+
+
+
+    def test_download_6(self):
+        # A file that no longer matches its recorded size is downloaded again
+        # without conditional headers, & its index entry is replaced
+        with tempfile.TemporaryDirectory() as out_dir:
+            self._download(_FakeResponse(200, chunks=[b'complete'],
+                                         headers={'ETag': '"v1"'}), out_dir)
+
+            out_path = self._out_path(out_dir)
+            with open(out_path, 'wb') as f_out:
+                f_out.write(b'trunc')
+
+            get = self._download(_FakeResponse(200, chunks=[b'complete'],
+                                               headers={'ETag': '"v2"'}), out_dir)
+
+            self.assertEqual(get.call_args[1]['headers'], {})
+            with open(out_path, 'rb') as f_in:
+                self.assertEqual(f_in.read(), b'complete')
+            with mock.patch.object(nohrsc, 'DL_CACHE_INDEX', join(out_dir, 'index.json')):
+                entry = nohrsc._read_cache_index()[get.call_args[0][0]]
+            self.assertEqual(entry['etag'], '"v2"')
+            self.assertEqual(entry['size'], len(b'complete'))
+
+
+
+    def test_download_7(self):
+        # A file with no index entry is downloaded without conditional headers
+        with tempfile.TemporaryDirectory() as out_dir:
+            with open(self._out_path(out_dir), 'wb') as f_out:
+                f_out.write(b'unknown')
+
+            get = self._download(_FakeResponse(200, chunks=[b'new']), out_dir)
+
+            self.assertEqual(get.call_args[1]['headers'], {})
+
+
+
+    def test_download_8(self):
+        # A new copy without cache headers drops the old copy's index entry
+        with tempfile.TemporaryDirectory() as out_dir:
+            self._download(_FakeResponse(200, chunks=[b'old'],
+                                         headers={'ETag': '"v1"'}), out_dir)
+
+            get = self._download(_FakeResponse(200, chunks=[b'new']), out_dir)
+
+            with mock.patch.object(nohrsc, 'DL_CACHE_INDEX', join(out_dir, 'index.json')):
+                self.assertNotIn(get.call_args[0][0], nohrsc._read_cache_index())
+
+
+
+
 if __name__ == '__main__':
     unittest.main()
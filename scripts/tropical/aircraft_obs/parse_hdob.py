@@ -5,8 +5,24 @@ This file contains files to access & parse High-Density/High-Accuracy Observatio
 (HDOBs) from NOAA & USAF weather reconassaince aircraft
 """
 import pandas as pd
+import re
 from datetime import datetime, timedelta
 from os.path import isfile
+from io import StringIO
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from requests.adapters import HTTPAdapter
+
+# Max number of concurrent HDOB downloads made by fetch_hdob_files
+DL_WORKERS = 16
+
+# Filename & publishing date-time of each file in the server's directory listing
+LISTING_RE = re.compile(r'href="([^"/?]+\.txt)".*?(\d{4}-\d{2}-\d{2} \d{2}:\d{2})')
+
+HDOB_COLS = ["obs_time", "lat", "lon", "static_air_press", "geo_pot_height",
+             "sfc_press_dval", "t_air", "t_dew", "wind_dir_spd", "wind_peak",
+             "sfc_wind_peak", "rain_rate", "qc_flags"]
 
 class HDOBFile(object):
     """
@@ -88,8 +104,8 @@ class HDOBFile(object):
         tuple of str
             Format: (first, last)
         """
-        first = data['obs_time'].iloc[0]
-        last = data['obs_time'].iloc[-1]
+        first = data['obs_time'].iat[0]
+        last = data['obs_time'].iat[-1]
 
         return (first, last)
 
@@ -143,54 +159,43 @@ def get_hdob_fnames(date=None, start=None, end=None, octant='AHONT1'):
 
     """
     col_names = ['filename', 'date_time']
-    drop_cols = [0, 3, 4]
     fname_dict = {'noaa': [], 'usaf': []}
     base_url = 'https://www.nhc.noaa.gov/archive/recon/'
 
     if (date):
-        date = datetime.strptime(date, '%Y%m%d')
+        date = _parse_dt(date)
         url_year = date.year
     elif (start):
         if not (end):
             raise ValueError("'end' argument cannot be None")
-        start = datetime.strptime(start, '%Y%m%d-%H%M')
-        end = datetime.strptime(end, '%Y%m%d-%H%M')
+        start = _parse_dt(start)
+        end = _parse_dt(end)
         url_year = start.year
     else:
         raise ValueError("'date' and 'start' args cannot both be None")
 
     base_url = base_url + '{}/{}/'.format(url_year, octant)
 
-    # Read the list of filenames from the url
-    fname_df = pd.read_html(base_url, skiprows=[0,1,2,3,4,5,6,7,8,9])[0]
-
-    # Drop all columns except for the filename & publishing date time columns
-    fname_df.drop(fname_df.columns[drop_cols],axis=1,inplace=True)
-
-    # Drop any NaN values
-    fname_df = fname_df.dropna(how="all")
+    # Read the list of filenames & their publishing date times from the url.
+    # The page is a plain directory listing, so the two fields are pulled out
+    # of each row with a regex rather than parsing the full HTML table
+    listing = LISTING_RE.findall(_fetch_text(base_url))
+    fname_df = pd.DataFrame(listing, columns=col_names)
 
-    # set the dataframe column names
-    fname_df.columns = col_names
+    # Parse the publishing times in one pass. Many files share a publishing
+    # time, so the parsed values are cached
+    pub_dt = pd.to_datetime(fname_df['date_time'], format='%Y-%m-%d %H:%M', cache=True)
 
     if (date):
-        for idx, row in fname_df.iterrows():
-            curr_dt = datetime.strptime(row['date_time'].split(' ')[0], '%Y-%m-%d')
-            curr_fname = row['filename']
-            if (curr_dt == date):
-                if ('KNHC' in curr_fname):
-                    fname_dict['usaf'].append(base_url + '{}'.format(curr_fname))
-                else:
-                    fname_dict['noaa'].append(base_url + '{}'.format(curr_fname))
+        in_range = (pub_dt >= date) & (pub_dt < date + timedelta(days=1))
     else:
-        for idx, row in fname_df.iterrows():
-            curr_dt = datetime.strptime(row['date_time'], '%Y-%m-%d %H:%M')
-            curr_fname = row['filename']
-            if ((curr_dt >= start) and (curr_dt <= end)):
-                if ('KNHC' in curr_fname):
-                    fname_dict['usaf'].append(base_url + '{}'.format(curr_fname))
-                else:
-                    fname_dict['noaa'].append(base_url + '{}'.format(curr_fname))
+        in_range = (pub_dt >= start) & (pub_dt <= end)
+
+    urls = base_url + fname_df.loc[in_range, 'filename']
+    is_usaf = urls.str.contains('KNHC', regex=False)
+
+    fname_dict['usaf'] = urls[is_usaf].tolist()
+    fname_dict['noaa'] = urls[~is_usaf].tolist()
 
     return fname_dict
 
@@ -209,29 +214,132 @@ def parse_hdob_file(path):
     -------
     hdob_file : HDOBFile object
     """
-    col_names = ["obs_time", "lat", "lon", "static_air_press", "geo_pot_height",
-                 "sfc_press_dval", "t_air", "t_dew", "wind_dir_spd", "wind_peak",
-                 "sfc_wind_peak", "rain_rate", "qc_flags"]
-    file_header = ''
-    obs_data = []
-
     # Determine if 'path' is a path or url
     if isfile(path):
         # open & read local file
         with open(path, 'r') as fh:
-            for idx, line in enumerate(fh):
-                line = line.rstrip('\n')
-
-                if (idx == 3):
-                    file_header = line
-                elif ((idx > 3) and (idx < 24)):
-                    curr_line = line.split(' ')
-                    curr_line = [x for x in curr_line if x != ' ']
-                    obs_data.append(curr_line)
-    hdob_df = pd.DataFrame(data=obs_data, index=range(0, len(obs_data)), columns=col_names)
-    hdob_obj = HDOBFile(file_header, hdob_df)
-    print(hdob_obj)
-    # elif (isURL):
+            hdob_obj = _parse_hdob(fh)
+    else:
+        hdob_obj = parse_hdob_text(_fetch_text(path))
+
+    return hdob_obj
+
+
+
+def parse_hdob_text(text):
+    """
+    Create a HDOBFile object from the text of an HDOB message, i.e., from a
+    downloaded file that hasn't been written to disk
+
+    Parameters
+    ----------
+    text : str
+        Contents of the HDOB file
+
+    Returns
+    -------
+    hdob_file : HDOBFile object
+    """
+    return _parse_hdob(StringIO(text))
+
+
+
+def fetch_hdob_files(urls, workers=DL_WORKERS):
+    """
+    Download & parse several HDOB files concurrently. The downloads share one
+    session so that connections to the server are reused, & the files are
+    parsed in memory rather than being written to disk
+
+    Parameters
+    ----------
+    urls : list of str
+        HDOB file urls, e.g. one of the lists returned by get_hdob_fnames
+    workers : int, optional
+        Max number of concurrent downloads. Default is DL_WORKERS
+
+    Returns
+    -------
+    list of HDOBFile objects, in the same order as urls
+    """
+    if (not urls):
+        return []
+
+    with ThreadPoolExecutor(max_workers=min(len(urls), workers)) as executor:
+        texts = list(executor.map(_fetch_text, urls))
+
+    return [parse_hdob_text(text) for text in texts]
+
+
+
+def _parse_hdob(fh):
+    """
+    Parse an open HDOB file. The 4 header lines are read off the top of the
+    file, then the C parser reads the 20 observation lines from the same
+    handle in one go
+
+    Parameters
+    ----------
+    fh : file-like object
+
+    Returns
+    -------
+    hdob_file : HDOBFile object
+    """
+    head = [fh.readline() for x in range(4)]
+    file_header = head[3].rstrip('\n')
+
+    # Every field is kept as the raw string, so NA detection is skipped too
+    hdob_df = pd.read_csv(fh, sep=r'\s+', nrows=20, header=None, names=HDOB_COLS,
+                          dtype=str, na_filter=False, engine='c')
+
+    return HDOBFile(file_header, hdob_df)
+
+
+
+@lru_cache(maxsize=1)
+def _get_session():
+    """
+    Create the requests Session shared by all downloads, so that connections
+    to the NHC server (and their TLS handshakes) are reused
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=DL_WORKERS, pool_maxsize=DL_WORKERS)
+    session.mount('https://', adapter)
+
+    return session
+
+
+
+def _fetch_text(url):
+    resp = _get_session().get(url, timeout=10)
+    resp.raise_for_status()
+
+    return resp.text
+
+
+
+def _parse_dt(dt_str):
+    """
+    Parses a fixed-width YYYYMMDD or YYYYMMDD-HHMM date string by slicing it,
+    rather than with strptime
+
+    Parameters
+    ----------
+    dt_str : str
+
+    Returns
+    -------
+    datetime object
+    """
+    if (len(dt_str) not in (8, 13)):
+        raise ValueError('Invalid date string {}'.format(dt_str))
+
+    date = datetime(int(dt_str[:4]), int(dt_str[4:6]), int(dt_str[6:8]))
+
+    if (len(dt_str) == 13):
+        date = date.replace(hour=int(dt_str[9:11]), minute=int(dt_str[11:13]))
+
+    return date
 
 
 
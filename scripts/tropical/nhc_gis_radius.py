@@ -15,26 +15,49 @@ Record:
 
 """
 import cartopy.io.shapereader as shpreader
+import shapefile
 import cartopy.feature as cfeature
 import matplotlib as mpl
 import matplotlib.pyplot as plt
 import cartopy.crs as ccrs
 from os.path import join
 import numpy as np
-import datetime
 import pandas as pd
 from os.path import isfile
+from functools import lru_cache
+from operator import itemgetter
 import time
 
 from sys import exit
 
+# Fetches the attributes used to build a NHCRadius from a record's attribute
+# dict in a single call
+_RADIUS_ATTRS = itemgetter('SYNOPTIME', 'STORMID', 'RADII', 'NE', 'SE', 'SW', 'NW')
+
 
 class NHCRadius(object):
     """
-    Object to represent an NHC best track radius shapefile record
+    Object to represent an NHC best track radius shapefile record. For large
+    shapefiles, prefer ingest_df & index its columns rather than iterating
+    over NHCRadius objects
+
+    Slotted rather than a NamedTuple, which would be no smaller, so that the
+    record geometry can be decoded lazily (see poly)
     """
-    def __init__(self, date, time, storm_id, radius, ne, se, sw, nw, poly):
-        super(NHCRadius, self).__init__()
+
+    __slots__ = ('date', 'time', 'storm_id', 'radius', 'ne', 'se', 'sw', 'nw',
+                 '_poly', '_record')
+
+    def __init__(self, date, time, storm_id, radius, ne, se, sw, nw, poly=None, record=None):
+        """
+        Parameters
+        ----------
+        poly : shapely geometry, optional
+            The record's geometry
+        record : cartopy shapereader Record, optional
+            The shapefile record. If given instead of poly, the geometry is only
+            decoded from the record the first time poly is accessed
+        """
         self.date = date
         self.time = time
         self.storm_id = storm_id
@@ -43,7 +66,24 @@ class NHCRadius(object):
         self.se = se
         self.sw = sw
         self.nw = nw
-        self.poly = poly
+        self._poly = poly
+        self._record = record
+
+
+
+    @property
+    def poly(self):
+        if (self._poly is None and self._record is not None):
+            self._poly = self._record.geometry
+            self._record = None
+        return self._poly
+
+
+
+    @poly.setter
+    def poly(self, poly):
+        self._poly = poly
+        self._record = None
 
 
 
@@ -69,18 +109,12 @@ def ingest_gen(shp_path):
     shp_reader = shpreader.Reader(shp_path)
 
     for rec in shp_reader.records():
-        curr_dt = datetime.datetime.strptime(rec.attributes['SYNOPTIME'], "%Y%m%d%H")
-        curr_date = datetime.datetime.strftime(curr_dt, "%m-%d-%Y")
-        curr_time = datetime.datetime.strftime(curr_dt, "%H:%M")
-        cur_id = rec.attributes['STORMID']
-        curr_rad = rec.attributes['RADII']
-        curr_ne = rec.attributes['NE']
-        curr_se = rec.attributes['SE']
-        curr_sw = rec.attributes['SW']
-        curr_nw = rec.attributes['NW']
+        (syn_time, cur_id, curr_rad, curr_ne, curr_se, curr_sw,
+            curr_nw) = _RADIUS_ATTRS(rec.attributes)
+        curr_date, curr_time = _fmt_synoptime(syn_time)
 
         curr_obj = NHCRadius(curr_date, curr_time, cur_id, curr_rad, curr_ne,
-                             curr_se, curr_sw, curr_nw, rec.geometry)
+                             curr_se, curr_sw, curr_nw, record=rec)
 
         yield curr_obj
 
@@ -99,27 +133,56 @@ def ingest_list(shp_path):
     ------
     radii : list of NHCRadius objects
     """
-    radii = []
+    radii = list(ingest_gen(shp_path))
 
-    shp_reader = shpreader.Reader(shp_path)
+    return radii
 
-    for rec in shp_reader.records():
-        curr_dt = datetime.datetime.strptime(rec.attributes['SYNOPTIME'], "%Y%m%d%H")
-        curr_date = datetime.datetime.strftime(curr_dt, "%m-%d-%Y")
-        curr_time = datetime.datetime.strftime(curr_dt, "%H:%M")
-        cur_id = rec.attributes['STORMID']
-        curr_rad = rec.attributes['RADII']
-        curr_ne = rec.attributes['NE']
-        curr_se = rec.attributes['SE']
-        curr_sw = rec.attributes['SW']
-        curr_nw = rec.attributes['NW']
 
-        curr_obj = NHCRadius(curr_date, curr_time, cur_id, curr_rad, curr_ne,
-                             curr_se, curr_sw, curr_nw, rec.geometry)
 
-        radii.append(curr_obj)
+def ingest_df(shp_path):
+    """
+    Reads a radii shapefile into a DataFrame with one typed column per NHCRadius
+    attribute, rather than one Python object per record. The record geometries
+    are returned separately, in the same order as the DataFrame rows
 
-    return radii
+    Parameters
+    ----------
+    shp_path : str
+        Absolute path, including the filename, of the shapefile to open & read
+
+    Return
+    ------
+    df : pandas DataFrame
+        Columns: ['date', 'time', 'storm_id', 'radius', 'ne', 'se', 'sw', 'nw']
+    geoms : numpy 1d array of object
+        Record geometries
+    """
+    # The attribute columns are built straight from the attribute table, read
+    # in one bulk call, rather than appended to record by record
+    attrs = _read_attributes(shp_path, ['SYNOPTIME', 'STORMID', 'RADII', 'NE',
+                                        'SE', 'SW', 'NW'])
+
+    # SYNOPTIME is fixed-width 'YYYYMMDDHH', so it is formatted by slicing
+    syn = attrs['SYNOPTIME'].str
+
+    df = pd.DataFrame({'date': syn[4:6] + '-' + syn[6:8] + '-' + syn[:4],
+                       'time': syn[8:10] + ':00',
+                       'storm_id': attrs['STORMID'],
+                       'radius': attrs['RADII'].astype(np.int16),
+                       'ne': attrs['NE'].astype(np.int32),
+                       'se': attrs['SE'].astype(np.int32),
+                       'sw': attrs['SW'].astype(np.int32),
+                       'nw': attrs['NW'].astype(np.int32)
+                       }, columns=['date', 'time', 'storm_id', 'radius', 'ne',
+                                   'se', 'sw', 'nw'])
+
+    geoms = list(shpreader.Reader(shp_path).geometries())
+
+    # Filled element-wise so numpy doesn't try to unpack the multipolygons
+    geoms_arr = np.empty(len(geoms), dtype=object)
+    geoms_arr[:] = geoms
+
+    return (df, geoms_arr)
 
 
 
@@ -132,38 +195,28 @@ def get_rec_df(shp_path, write=False, outpath=None):
     shp_path : str
         Absolute path, including the filename, of the shapefile to open & read
     """
-    col_names = ['date-time', 'storm_id', 'radii', 'ne', 'se', 'sw', 'nw']
-    data = []
-
-    shp_reader = shpreader.Reader(shp_path)
-
-    for rec in shp_reader.records():
-        curr_dt = datetime.datetime.strptime(rec.attributes['SYNOPTIME'], "%Y%m%d%H")
-        curr_dt = datetime.datetime.strftime(curr_dt, "%m-%d-%Y-%H%M")
-        cur_id = rec.attributes['STORMID']
-        curr_rad = rec.attributes['RADII']
-        curr_ne = rec.attributes['NE']
-        curr_se = rec.attributes['SE']
-        curr_sw = rec.attributes['SW']
-        curr_nw = rec.attributes['NW']
-
-        curr_dict = {'date-time': curr_dt,
-                    'storm_id': cur_id,
-                    'radii': curr_rad,
-                    'ne': curr_ne,
-                    'se': curr_se,
-                    'sw': curr_sw,
-                    'nw': curr_nw
-                    }
-
-        data.append(curr_dict)
-
-    df = pd.DataFrame(data, columns=col_names)
+    # Only the attribute table is needed, so it's read in one bulk call
+    # rather than decoding every record's geometry
+    attrs = _read_attributes(shp_path, ['SYNOPTIME', 'STORMID', 'RADII', 'NE',
+                                        'SE', 'SW', 'NW'])
+
+    # SYNOPTIME is fixed-width 'YYYYMMDDHH', so it is formatted by slicing
+    syn = attrs['SYNOPTIME'].str
+    date_times = syn[4:6] + '-' + syn[6:8] + '-' + syn[:4] + '-' + syn[8:10] + '00'
+
+    df = pd.DataFrame({'date-time': date_times,
+                       'storm_id': attrs['STORMID'],
+                       'radii': attrs['RADII'].astype(np.int16),
+                       'ne': attrs['NE'].astype(np.int32),
+                       'se': attrs['SE'].astype(np.int32),
+                       'sw': attrs['SW'].astype(np.int32),
+                       'nw': attrs['NW'].astype(np.int32)
+                       })
     df = df.set_index('date-time')
 
     if (write):
         if (outpath):
-            df.to_csv(outpath, sep=',', header=col_names)
+            df.to_csv(outpath, sep=',')
         else:
             raise ValueError("'outpath' parameter cannot be None")
     return df
@@ -190,13 +243,15 @@ def get_radius_meta(shp_path):
     """
     meta = {}
 
-    shp_reader = shpreader.Reader(shp_path)
-
-    # Get the date & time of the first record
-    first_rec = next(shp_reader.records()).attributes
+    # Only the attribute table is needed, so it's read in one bulk call
+    # rather than decoding every record's geometry
+    attrs = _read_attributes(shp_path, ['SYNOPTIME', 'STORMID', 'BASIN',
+                                        'STORMNUM', 'RADII', 'NE', 'SE', 'SW',
+                                        'NW'])
 
-    first_dt = datetime.datetime.strptime(first_rec['SYNOPTIME'], "%Y%m%d%H")
-    first_dt = datetime.datetime.strftime(first_dt, "%m-%d-%Y-%H:%Mz")
+    first_rec = attrs.iloc[0]
+    first_dt = '{}-{}z'.format(*_fmt_synoptime(first_rec['SYNOPTIME']))
+    last_dt = '{}-{}z'.format(*_fmt_synoptime(attrs['SYNOPTIME'].iat[-1]))
 
     storm_basin = first_rec['BASIN']
     storm_id = first_rec['STORMID']
@@ -209,41 +264,29 @@ def get_radius_meta(shp_path):
     }
 
     rec_count_by_radii = {34: 0, 50: 0, 64: 0}
-    timesteps = []
-
-    for rec in shp_reader.records():
-        curr_dt = rec.attributes['SYNOPTIME']
-        timesteps.append(curr_dt)
 
-        # Update maximum Saffir-Simpson rating if necessary
-        curr_rad = rec.attributes['RADII']
-        ne_rad = rec.attributes['NE']
-        se_rad = rec.attributes['SE']
-        sw_rad = rec.attributes['SW']
-        nw_rad = rec.attributes['NW']
+    # Find the maximum extent of each wind radius & the first time it occurred.
+    # Each record's largest sector is taken first so that idxmax picks the
+    # earliest record with the maximum extent
+    rec_max = attrs[['NE', 'SE', 'SW', 'NW']].max(axis=1)
+    by_radii = rec_max.groupby(attrs['RADII'])
+    counts = by_radii.size()
+    max_idx = by_radii.idxmax()
 
-        for sector in [ne_rad, se_rad, sw_rad, nw_rad]:
-            if (sector > max_rads[curr_rad]['radius']):
-                max_rads[curr_rad]['radius'] = sector
-                max_rads[curr_rad]['time'] = curr_dt
+    for key in max_rads:
+        if (key not in counts.index):
+            continue
 
-        rec_count_by_radii[curr_rad] += 1
+        rec_count_by_radii[key] = int(counts[key])
 
-    last_dt = datetime.datetime.strptime(curr_dt, "%Y%m%d%H")
-    last_dt = datetime.datetime.strftime(last_dt, "%m-%d-%Y-%H:%Mz")
+        idx = max_idx[key]
+        if (rec_max[idx] > 0):
+            max_rads[key]['radius'] = int(rec_max[idx])
+            max_rads[key]['time'] = '{}-{}z'.format(*_fmt_synoptime(attrs['SYNOPTIME'][idx]))
 
-    # Format the datetime strings for the maximum radii
-    for key, val in max_rads.items():
-        curr_dt = max_rads[key]['time']
-        curr_dt = datetime.datetime.strptime(curr_dt, "%Y%m%d%H")
-        curr_dt = datetime.datetime.strftime(curr_dt, "%m-%d-%Y-%H:%Mz")
-        max_rads[key]['time'] = curr_dt
+    num_records = sum(rec_count_by_radii.values())
 
-    num_records = 0
-    for key, val in rec_count_by_radii.items():
-        num_records += val
-
-    num_timesteps = len(list(set(timesteps)))
+    num_timesteps = attrs['SYNOPTIME'].nunique()
 
     meta['first_dt'] = first_dt
     meta['last_dt'] = last_dt
@@ -259,29 +302,88 @@ def get_radius_meta(shp_path):
 
 
 
+def _read_attributes(shp_path, fields):
+    """
+    Reads the attribute table of a shapefile into a DataFrame. The table is
+    read from the .dbf in one call, without decoding any of the geometries
+
+    Parameters
+    ----------
+    shp_path : str
+        Absolute path, including the filename, of the shapefile to open & read
+    fields : list of str
+        Attributes to return
+
+    Returns
+    -------
+    pandas DataFrame
+    """
+    shp_file = shapefile.Reader(shp_path)
+    try:
+        try:
+            # pyshp >= 2.2 can skip decoding the fields that aren't needed. The
+            # requested fields are returned in the order they're stored in
+            records = shp_file.records(fields=fields)
+            field_names = list(records[0].as_dict()) if records else fields
+        except TypeError:
+            # The first field is pyshp's DeletionFlag, which has no column
+            records = shp_file.records()
+            field_names = [field[0] for field in shp_file.fields[1:]]
+
+        attrs = pd.DataFrame(records, columns=field_names)
+    finally:
+        shp_file.close()
+
+    return attrs[fields]
+
+
+
+@lru_cache(maxsize=4096)
+def _fmt_synoptime(synoptime):
+    """
+    Formats a record's SYNOPTIME attribute. SYNOPTIME is a fixed-width
+    'YYYYMMDDHH' string, so it is sliced rather than parsed into a datetime.
+    Cached as every radii record at a given synoptic time shares the same string
+
+    Parameters
+    ----------
+    synoptime : str
+        Format: YYYYMMDDHH
+
+    Returns
+    -------
+    tuple of str
+        Format: ('MM-DD-YYYY', 'HH:MM')
+    """
+    return ('{}-{}-{}'.format(synoptime[4:6], synoptime[6:8], synoptime[:4]),
+            '{}:00'.format(synoptime[8:10]))
+
+
+
 def pp_meta(meta_dict):
     """
-    Pretty print func for meta dict
+    Pretty print func for meta dict. The lines are joined & printed at once
     """
-    # Determine the length of the longest key
-    keys = list(meta_dict.keys())
-    a_keys = [x for x in keys if type(meta_dict[x]) != dict]
-    max_len = len(max(a_keys, key=len))
+    # Determine the length of the longest non-dict key
+    max_len = max(len(key) for key, val in meta_dict.items() if type(val) != dict)
+
+    lines = []
 
     for key, val in meta_dict.items():
-        # Print the key with appended spaces to the end to make it the same
-        # length as the longest key
+        # Pad the key with spaces to make it the same length as the longest key
         if (type(val) != dict):
-            print('{} --> {}'.format(key.ljust(max_len), val))
+            lines.append('{} --> {}'.format(key.ljust(max_len), val))
         else:
-            print(key)
+            lines.append(key)
             if (key == 'max_rads'):
                 for sub_key, sub_val in val.items():
-                    print('\t{}kts --> {} nm at {}'.format(str(sub_key).ljust(3),
-                          sub_val['radius'], sub_val['time']))
+                    lines.append('\t{}kts --> {} nm at {}'.format(str(sub_key).ljust(3),
+                                 sub_val['radius'], sub_val['time']))
             else:
                 for sub_key, sub_val in val.items():
-                    print('\t{}kts --> {}'.format(str(sub_key).ljust(3), sub_val))
+                    lines.append('\t{}kts --> {}'.format(str(sub_key).ljust(3), sub_val))
+
+    print('\n'.join(lines))
 
 
 
@@ -300,6 +402,9 @@ def main():
     # radii = ingest_list(shp_path)
     # for rec in radii:
     #     print(rec)
+    #
+    # df, geoms = ingest_df(shp_path)
+    # print(df[df['radius'] == 64])
 
     # df = get_rec_df(shp_path)
     # print(df)
@@ -25,20 +25,48 @@ Notes
                               'SS', 'LAT', 'LON']
 
 """
-import cartopy.io.shapereader as shpreader
+import shapefile
 import cartopy.feature as cfeature
+from os import environ, cpu_count, replace
 import matplotlib as mpl
+
+# Use the non-interactive Agg backend when running headless (WX_HEADLESS=1),
+# so no GUI toolkit is initialized just to save figures
+if (environ.get('WX_HEADLESS') == '1'):
+    mpl.use('Agg')
+
 import matplotlib.pyplot as plt
+from matplotlib.collections import LineCollection
 import cartopy.crs as ccrs
+from shapely.geometry import box
+from shapely.strtree import STRtree
 from os.path import join
 import numpy as np
-import datetime
 import pandas as pd
-from os.path import isfile
+from os.path import isfile, getmtime, splitext
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor
 import time
+import re
+import pickle
 
 from sys import exit
 
+from nhc_gis_radius import _read_attributes
+
+# Frequency strings accepted by interp_track_df: an optional integer multiple
+# followed by a pandas offset alias. Ex: 'T', '1T', '10T', '30min', '1H'
+_FREQ_RE = re.compile(r'^(\d*)(H|T|min|S|L|ms|D|W)$')
+
+# Projections used by the track plots. Built once, as constructing a cartopy
+# CRS (& the pyproj objects behind it) is expensive
+_CRS_PC = ccrs.PlateCarree()
+_CRS_MERC = ccrs.Mercator()
+
+# Extension appended to a best track shapefile's path to get the path of its
+# cached DataFrame (see load_track)
+TRACK_CACHE_EXT = '.pkl'
+
 
 
 ################################################################################
@@ -47,15 +75,123 @@ from sys import exit
 
 
 
-def get_track_meta(shp_path):
+def load_track(shp_path, read_points=True, use_cache=True):
     """
-    Get metadata from the Best Track shapefile
+    Read the Best Track shapefile's attribute table & point coordinates into a
+    single DataFrame. The shapefile is only read once, the metadata & track
+    DataFrames are then derived from the result (see get_track_meta &
+    track_to_df)
+
+    The DataFrame is cached next to the shapefile (shp_path + TRACK_CACHE_EXT)
+    & read from the cache on later calls, as long as the cache is newer than
+    the shapefile
 
     Parameters
     ----------
     shp_path : str
         Absolute path, including the filename, of the NHC best track shapefile
         to open and read
+    read_points : bool, optional
+        If False, only the attribute table is read & the point geometries are
+        never decoded. The result is then only suitable for get_track_meta.
+        Default: True
+    use_cache : bool, optional
+        If False, the cache is neither read nor written. Default: True
+
+    Returns
+    -------
+    track : Pandas DataFrame
+        Column names: ['MONTH', 'DAY', 'YEAR', 'HHMM', 'STORMNAME', 'STORMNUM',
+                       'BASIN', 'MSLP', 'STORMTYPE', 'INTENSITY', 'SS', 'lon', 'lat']
+        'lon' & 'lat' are omitted if read_points is False
+    """
+    if (use_cache):
+        track = _read_track_cache(shp_path)
+        if (track is not None):
+            return track if read_points else track.drop(columns=['lon', 'lat'])
+
+    attrs = _read_attributes(shp_path, ['MONTH', 'DAY', 'YEAR', 'HHMM', 'STORMNAME',
+                                        'STORMNUM', 'BASIN', 'MSLP', 'STORMTYPE',
+                                        'INTENSITY', 'SS'])
+
+    if (not read_points):
+        return attrs
+
+    track_pts = _read_points(shp_path)
+    track = attrs.assign(lon=track_pts[:, 0], lat=track_pts[:, 1])
+
+    if (use_cache):
+        _write_track_cache(shp_path, track)
+
+    return track
+
+
+
+def _read_track_cache(shp_path):
+    """
+    Reads the cached track DataFrame of a best track shapefile
+
+    Parameters
+    ----------
+    shp_path : str
+        Absolute path, including the filename, of the best track shapefile
+
+    Returns
+    -------
+    Pandas DataFrame, or None if there is no cache, it is older than the
+    shapefile, the shapefile is missing, or the cache can't be read (e.g. it
+    was written by another version of pandas)
+    """
+    cache_path = shp_path + TRACK_CACHE_EXT
+    src_paths = [shp_path, splitext(shp_path)[0] + '.dbf']
+
+    if (not isfile(cache_path) or not all(isfile(path) for path in src_paths)):
+        return None
+
+    try:
+        if (getmtime(cache_path) < max(getmtime(path) for path in src_paths)):
+            return None
+
+        return pd.read_pickle(cache_path)
+    except (OSError, ValueError, EOFError, pickle.UnpicklingError, AttributeError,
+            ImportError):
+        return None
+
+
+
+def _write_track_cache(shp_path, track):
+    """
+    Writes the cached track DataFrame of a best track shapefile. The cache is
+    written to a temporary file first & then moved into place, so a partially
+    written cache is never read. Directories that can't be written to are
+    skipped silently, the track is then just read from the shapefile each time
+
+    Parameters
+    ----------
+    shp_path : str
+        Absolute path, including the filename, of the best track shapefile
+    track : Pandas DataFrame
+        DataFrame returned by load_track
+    """
+    cache_path = shp_path + TRACK_CACHE_EXT
+    tmp_path = cache_path + '.tmp'
+
+    try:
+        track.to_pickle(tmp_path)
+        replace(tmp_path, cache_path)
+    except OSError:
+        pass
+
+
+
+def get_track_meta(track):
+    """
+    Get metadata from the Best Track data
+
+    Parameters
+    ----------
+    track : Pandas DataFrame
+        Best track data, as returned by load_track
 
     Returns
     -------
@@ -67,43 +203,25 @@ def get_track_meta(shp_path):
     """
     meta = {}
 
-    shp_reader = shpreader.Reader(shp_path)
-    first_rec = next(shp_reader.records())
-
-    # Get the date & time of the first record
-    first_dt = '{}{}{}-{}'.format(first_rec.attributes['MONTH'], first_rec.attributes['DAY'],
-                                  first_rec.attributes['YEAR'], first_rec.attributes['HHMM'])
-
-    first_dt = datetime.datetime.strptime(first_dt, "%m%d%Y-%H%M")
-    first_dt = datetime.datetime.strftime(first_dt, "%m-%d-%Y-%H:%Mz")
-
-    max_ss = 0
-    max_wind = 0
-    num_records = 0
+    last_rec = track.iloc[-1]
 
-    for rec in shp_reader.records():
-        num_records += 1
-        storm_name = rec.attributes['STORMNAME']
-        storm_basin = rec.attributes['BASIN']
-        storm_num = rec.attributes['STORMNUM']
+    # Get the date & time of the first & last records. The date-time strings
+    # are fixed-width 'MM-DD-YYYY-HHMM', so they are reformatted by slicing
+    # rather than parsed
+    first_dtg, last_dtg = _dtg_strings(track.iloc[[0, -1]])
+    first_dt = _fmt_dtg(first_dtg)
+    last_dt = _fmt_dtg(last_dtg)
 
-        # Update maximum Saffir-Simpson rating if necessary
-        curr_ss = rec.attributes['SS']
-        if (curr_ss > max_ss):
-            max_ss = curr_ss
+    # Maximum Saffir-Simpson rating & storm intensity over the whole track
+    max_ss = int(track['SS'].max())
+    max_wind = int(track['INTENSITY'].max())
+    num_records = len(track)
 
-        # Update maximum storm intensity if necessary
-        curr_wind = rec.attributes['INTENSITY']
-        if (curr_wind > max_wind):
-            max_wind = curr_wind
+    storm_name = last_rec['STORMNAME']
+    storm_basin = last_rec['BASIN']
+    storm_num = last_rec['STORMNUM']
 
-        last_dt = '{}{}{}-{}'.format(rec.attributes['MONTH'], rec.attributes['DAY'],
-                                     rec.attributes['YEAR'], rec.attributes['HHMM'])
-
-    last_dt = datetime.datetime.strptime(last_dt, "%m%d%Y-%H%M")
-    last_dt = datetime.datetime.strftime(last_dt, "%m-%d-%Y-%H:%Mz")
-
-    year = rec.attributes['YEAR']
+    year = int(last_rec['YEAR'])
     storm_num = str(storm_num).zfill(2)
 
     storm_id = '{}{}{}'.format(storm_basin.upper(), storm_num, year)
@@ -123,18 +241,84 @@ def get_track_meta(shp_path):
 
 
 
+def _read_points(shp_path):
+    """
+    Reads the coordinates of every point in a point shapefile into an array, in
+    a single pass over the shapes
+
+    Parameters
+    ----------
+    shp_path : str
+        Absolute path, including the filename, of the shapefile to open & read
+
+    Returns
+    -------
+    numpy 2d array of float
+        Shape: (num_records, 2), columns: (lon, lat)
+    """
+    shp_file = shapefile.Reader(shp_path)
+    try:
+        coords = np.array([shape.points[0] for shape in shp_file.iterShapes()],
+                          dtype=np.float64)
+    finally:
+        shp_file.close()
+
+    return coords.reshape(-1, 2)
+
+
+
+def _dtg_strings(attrs):
+    """
+    Builds the date-time string of each best track record from its MONTH, DAY,
+    YEAR, & HHMM attributes, as whole-column string operations
+
+    Parameters
+    ----------
+    attrs : pandas DataFrame
+        Best track attribute table
+
+    Returns
+    -------
+    pandas Series of str
+        Format: MM-DD-YYYY-HHMM
+    """
+    month = attrs['MONTH'].astype(str).str.zfill(2)
+    day = attrs['DAY'].astype(str).str.zfill(2)
+    hhmm = attrs['HHMM'].astype(str).str.zfill(4)
+
+    return month.str.cat([day, attrs['YEAR'].astype(str), hhmm], sep='-')
+
+
+
+def _fmt_dtg(dtg):
+    """
+    Formats a best track date-time string for the metadata dict
+
+    Parameters
+    ----------
+    dtg : str
+        Format: MM-DD-YYYY-HHMM
+
+    Returns
+    -------
+    str
+        Format: MM-DD-YYYY-HH:MMz
+    """
+    return '{}:{}z'.format(dtg[:13], dtg[13:])
+
+
+
 def pp_meta(meta_dict):
     """
-    Pretty print func for meta dict
+    Pretty print func for meta dict. The lines are joined & printed at once
     """
     # Determine the length of the longest key
-    keys = list(meta_dict.keys())
-    max_len = len(max(keys, key=len))
+    max_len = max(map(len, meta_dict))
 
-    for key, val in meta_dict.items():
-        # Print the key with appended spaces to the end to make it the same
-        # length as the longest key
-        print('{} --> {}'.format(key.ljust(max_len), val))
+    # Each key is padded with spaces to make it the same length as the
+    # longest key
+    print('\n'.join('{} --> {}'.format(key.ljust(max_len), val)
+                    for key, val in meta_dict.items()))
 
 
 
@@ -158,50 +342,76 @@ def track_shp_to_df(shp_path, outpath=None, write=False):
     -------
     df : Pandas Dataframe
 
+    """
+    return track_to_df(load_track(shp_path), outpath=outpath, write=write)
+
+
+
+def shp_batch_to_df(shp_paths, workers=None):
+    """
+    Read several best track shapefiles (ex: every storm in a season) into a
+    single Pandas DataFrame
+
+    Parameters
+    ----------
+    shp_paths : list of str
+        Absolute paths, including the filenames, of the best track shapefiles
+        to open & read
+    workers : int, optional
+        Number of processes to read the shapefiles with. Each file is
+        independent, so they are read in parallel. Defaults to the number of
+        CPUs. If 1, the files are read serially
+
+    Returns
+    -------
+    df : Pandas DataFrame
+        The track_shp_to_df DataFrames of each shapefile, concatenated in the
+        order of shp_paths
+    """
+    if (workers is None):
+        workers = cpu_count()
+
+    if (workers > 1 and len(shp_paths) > 1):
+        with ProcessPoolExecutor(max_workers=min(workers, len(shp_paths))) as executor:
+            dfs = list(executor.map(track_shp_to_df, shp_paths))
+    else:
+        dfs = [track_shp_to_df(shp_path) for shp_path in shp_paths]
+
+    return pd.concat(dfs)
+
+
+
+def track_to_df(track, outpath=None, write=False):
+    """
+    Build the best track DataFrame from the data returned by load_track, and
+    write it to csv file if desired
+
+    Parameters
+    ----------
+    track : Pandas DataFrame
+        Best track data, as returned by load_track
+    outpath : str, optional
+        Absolute path, including the filename, of the csv/txt file to write
+        the best track data to. Required if writing to file
+    write: bool, optional
+        If True, the dataframe will be written to a file specified by the
+        'outpath' parameter. Default: False
+
+    Returns
+    -------
+    df : Pandas Dataframe
+
     """
     col_names = ['date-time', 'name', 'storm_num', 'basin', 'lat',
                  'lon', 'mslp', 'storm_type', 'wind', 'ss']
-    data = []
-
-    shp_reader = shpreader.Reader(shp_path)
-
-    track_pts = list(shp_reader.geometries())
-    lons = [pt.x for pt in track_pts]
-    lats = [pt.y for pt in track_pts]
-
-    for rec in shp_reader.records():
-        dt = '{}-{}-{}-{}'.format(
-                                str(rec.attributes['MONTH']).zfill(2),
-                                str(rec.attributes['DAY']).zfill(2),
-                                rec.attributes['YEAR'],
-                                rec.attributes['HHMM']
-                                )
-        lon = rec.geometry.x
-        lat = rec.geometry.y
-        name = rec.attributes['STORMNAME']
-        storm_num = rec.attributes['STORMNUM']
-        basin = rec.attributes['BASIN']
-        mslp = rec.attributes['MSLP']
-        storm_type = rec.attributes['STORMTYPE']
-        wind = rec.attributes['INTENSITY']
-        ss = rec.attributes['SS']
-
-        curr_dict = {'date-time': dt,
-                    'name': name,
-                    'storm_num': storm_num,
-                    'basin': basin,
-                    'lon': lon,
-                    'lat': lat,
-                    'storm_type': storm_type,
-                    'mslp': mslp,
-                    'wind': wind,
-                    'ss': ss
-                    }
-
-        data.append(curr_dict)
-
-    df = pd.DataFrame(data, columns=col_names)
-    df = df.set_index('date-time')
+
+    # Rename the shapefile attributes to the DataFrame's column names
+    df = track.rename(columns={'STORMNAME': 'name', 'STORMNUM': 'storm_num',
+                               'BASIN': 'basin', 'MSLP': 'mslp',
+                               'STORMTYPE': 'storm_type', 'INTENSITY': 'wind',
+                               'SS': 'ss'})
+    df['date-time'] = _dtg_strings(track)
+    df = df[col_names].set_index('date-time')
 
     if (write):
         if (outpath):
@@ -222,14 +432,14 @@ def track_csv_to_df(abs_path):
     Returns
     -------
     df : Pandas DataFrame
-        DataFrame containing the best track data
-        Column names: ['date-time', 'name', 'storm_num', 'basin', 'lat',
-                       'lon', 'mslp', 'storm_type', 'wind', 'ss']
+        DataFrame containing the best track data, indexed by 'date-time'
+        Column names: ['name', 'storm_num', 'basin', 'lat', 'lon', 'mslp',
+                       'storm_type', 'wind', 'ss']
 
         or
 
-        col_names = ['date-time', 'storm_num', 'lat', 'lon', 'mslp', 'wind', 'ss']
-        if reading an interpolated data file
+        Column names: ['storm_num', 'lat', 'lon', 'mslp', 'wind', 'ss']
+        if reading a data file written from interp_track_df's output
     """
     if (isfile(abs_path)):
         df = pd.read_csv(abs_path, sep=',', header=0, index_col='date-time')
@@ -260,14 +470,28 @@ def track_df_to_csv(df, outpath):
 
 
 
-def pp_df(df):
-    from time import sleep
+def pp_df(df, delay=0):
+    """
+    Pretty print func for a best track DataFrame. The whole table is written
+    in a single print unless a delay between rows is requested
+
+    Parameters
+    ----------
+    df : Pandas DataFrame
+    delay : float, optional
+        Seconds to pause after printing each row. Default: 0
+    """
+    cols = ['lat', 'lon', 'mslp', 'wind']
+
+    if (not delay):
+        print(df[cols].to_string(float_format=lambda val: '{:.3f}'.format(val)))
+        return
 
-    for index, row in df.iterrows():
-        # ['storm_num', 'lat', 'lon', 'mslp', 'wind', 'ss']
+    # Plain tuples rather than a Series per row
+    for index, lat, lon, mslp, wind in df[cols].itertuples(index=True, name=None):
         print('{0}   {1:.3f}   {2:.3f}   {3:.3f}   {4:.3f}'.format(index,
-                row['lat'], row['lon'], row['mslp'], row['wind']))
-        sleep(0.1)
+                lat, lon, mslp, wind))
+        time.sleep(delay)
 
 
 ################################################################################
@@ -275,6 +499,121 @@ def pp_df(df):
 ################################################################################
 
 
+def _auto_scale(extent):
+    """
+    Selects the Natural Earth scale to use for a plot extent. Coarser scales
+    are used for larger extents, where the finer detail isn't visible but is
+    much more expensive to read & project
+
+    Parameters
+    ----------
+    extent : list or tuple of float
+        Format: [min_lon, max_lon, min_lat, max_lat]
+
+    Returns
+    -------
+    str
+        '110m', '50m', or '10m'
+    """
+    span = max(extent[1] - extent[0], extent[3] - extent[2])
+
+    if (span > 60):
+        return '110m'
+    elif (span > 10):
+        return '50m'
+    return '10m'
+
+
+
+@lru_cache(maxsize=None)
+def _ne_feature(category, name, scale):
+    """
+    Returns the Natural Earth feature for the given category, name, & scale.
+    Cached so repeated plots reuse the same feature object, & with it the
+    geometries cartopy has already read from the Natural Earth shapefile
+
+    Parameters
+    ----------
+    category : str
+        Ex: 'physical', 'cultural'
+    name : str
+        Ex: 'land', 'admin_0_countries', 'admin_1_states_provinces'
+    scale : str
+        Ex: '110m', '50m', '10m'
+
+    Returns
+    -------
+    cartopy NaturalEarthFeature
+    """
+    return cfeature.NaturalEarthFeature(category=category, name=name, scale=scale,
+                                        facecolor='none')
+
+
+
+@lru_cache(maxsize=32)
+def _ne_feature_in_extent(category, name, scale, extent):
+    """
+    Returns a feature holding only the geometries of a Natural Earth feature
+    that intersect the given extent. Candidate geometries are found with an
+    STRtree query on the extent's bounding box
+
+    Parameters
+    ----------
+    category : str
+    name : str
+    scale : str
+        See _ne_feature
+    extent : tuple of float
+        Format: (min_lon, max_lon, min_lat, max_lat)
+
+    Returns
+    -------
+    cartopy ShapelyFeature
+    """
+    feature = _ne_feature(category, name, scale)
+    bbox = box(extent[0], extent[2], extent[1], extent[3])
+
+    geoms = list(feature.geometries())
+    tree = STRtree(geoms)
+
+    # shapely < 2.0 returns the candidate geometries, >= 2.0 returns their indices
+    hits = [geoms[hit] if isinstance(hit, (int, np.integer)) else hit
+            for hit in tree.query(bbox)]
+    hits = [geom for geom in hits if geom.intersects(bbox)]
+
+    return cfeature.ShapelyFeature(hits, _CRS_PC, facecolor='none')
+
+
+
+def _draw_track(ax, lons, lats, transform, zorder):
+    """
+    Draws a storm track as a single LineCollection of its segments plus a single
+    scatter of its points, rather than one Line2D with per-point markers. The
+    points are projected to the axes' projection up front in one vectorized
+    call, so cartopy does not have to transform the artists' paths itself
+
+    Parameters
+    ----------
+    ax : cartopy GeoAxes
+    lons : list or numpy 1d array of float
+    lats : list or numpy 1d array of float
+    transform : cartopy CRS
+        CRS of the lon & lat coordinates
+    zorder : int
+    """
+    proj = ax.projection
+    xy = proj.transform_points(transform, np.asarray(lons, dtype=np.float64),
+                               np.asarray(lats, dtype=np.float64))[:, :2]
+
+    pts = xy.reshape(-1, 1, 2)
+    segs = np.concatenate([pts[:-1], pts[1:]], axis=1)
+
+    ax.add_collection(LineCollection(segs, colors='red', transform=proj,
+                                     zorder=zorder))
+    ax.scatter(xy[:, 0], xy[:, 1], c='red', marker='o', transform=proj, zorder=zorder)
+
+
+
 def interp_track_df(df, freq):
     """
     Interpolate the dataframe to 1-minute
@@ -306,48 +645,31 @@ def interp_track_df(df, freq):
         Dataframe containing interpolated data.
         Column names: ['storm_num', 'lat', 'lon', 'mslp', 'wind', 'ss']
     """
-    valid_freqs = ['H', 'T', 'min', 'S', 'L', 'ms', 'D', 'W']
-
-    # Validate the frequency string
-    if (len(freq) > 1):
-        # If there is a number attached to the frequency alias
-        key = freq[1]
-        val = freq[0]
-
-        try:
-            val = int(val)
-        except ValueError:
-            raise ValueError('Invalid frequency argument')
-
-    # Validate the frequency alias. Works regardless of if a leading number
-    # is attached or not
-    if (not freq[-1] in valid_freqs):
+    # Validate the frequency string: an optional multiple followed by one of
+    # the supported offset aliases
+    if (not _FREQ_RE.match(freq)):
         raise ValueError('Invalid frequency argument')
 
 
-    start_dt = df.index[0]
-    start_dt = datetime.datetime.strptime(start_dt, '%m-%d-%Y-%H%M')
-
-    end_dt = df.index[-1]
-    end_dt = datetime.datetime.strptime(end_dt, '%m-%d-%Y-%H%M')
-
     # Convert the index type from str to pandas timestamp
-    df.index = pd.to_datetime(df.index, format='%m-%d-%Y-%H%M')
+    track_dts = pd.to_datetime(df.index, format='%m-%d-%Y-%H%M')
 
     # Calculate the times between start & end that we want to interpolate
     # data for
-    interp_times = pd.date_range(start=start_dt, end=end_dt, freq=freq)
+    interp_times = pd.date_range(start=track_dts[0], end=track_dts[-1], freq=freq,
+                                 name='date-time')
 
-    # Resample the dataframe for 1-min
-    # Resampling removes 'name', 'basin', & 'storm_type' columns
-    # Resulting columns are: date-time (index), ['storm_num', 'lat', 'lon',
-    #                                            'mslp', 'wind', 'ss']
-    df = df.resample(freq).sum()
+    # Linearly interpolate each numeric column in time, using seconds since
+    # the first record as the time coordinate. The 'name', 'basin', &
+    # 'storm_type' columns are dropped
+    src_secs = (track_dts - track_dts[0]).total_seconds().values
+    dst_secs = (interp_times - track_dts[0]).total_seconds().values
 
-    # Set 0 values after the first row to NaN to prepare for interpolation
-    df[df.iloc[1:] == 0] = np.NaN
+    col_names = ['storm_num', 'lat', 'lon', 'mslp', 'wind', 'ss']
+    interp_data = {col: np.interp(dst_secs, src_secs, df[col].values.astype(np.float64))
+                   for col in col_names}
 
-    df = df.interpolate(method='time', limit_direction='forward')
+    df = pd.DataFrame(interp_data, index=interp_times, columns=col_names)
 
     return df
 
@@ -359,74 +681,36 @@ def plot_track_from_df(df, storm_name, year, extent=None, show=True, save=False,
 
     extent: [ymin, ymax, xmin, xmax] aka [min_lat, max_lat, min_lon, max_lon]
     """
-    t_start = time.time()
-    z_ord = {'base': 0,
-             'land': 1,
-             'states': 2,
-             'track': 3,
-             'top': 10
-             }
+    # Nothing to do if the plot would be neither shown nor saved
+    if (not (show or save)):
+        return
 
-    crs_plt = ccrs.PlateCarree()
-
-    if (extent):
-        plt_extent = [extent[2], extent[3], extent[0], extent[1]]
-    else:
-        # x0, x1, y0, y1
-        plt_extent = [-180, 0, 0, 90]
+    _plot_track(df['lon'], df['lat'], storm_name, year, extent=extent, show=show,
+                save=save, outpath=outpath)
 
-    land_50m = cfeature.NaturalEarthFeature('physical', 'land', '50m', facecolor='none')
-    states_50m = cfeature.NaturalEarthFeature(category='cultural', name='admin_1_states_provinces',
-                                              scale='50m', facecolor='none')
-    countries_50m = cfeature.NaturalEarthFeature(category='cultural', name='admin_0_countries',
-                                                 scale='50m', facecolor='none')
 
-    fig = plt.figure(figsize=(12, 8))
 
-    ax = fig.add_subplot(111, projection=ccrs.Mercator())
+def plot_raw_track(shp_path, storm_name, year, extent=None, show=True, save=False, outpath=None):
+    """
 
-    # Set axis background color to black
-    ax.imshow(
-        np.tile(
-            np.array(
-                [[[0, 0, 0]]], dtype=np.uint8),
-            [2, 2, 1]),
-        origin='upper', transform=crs_plt, extent=[-180, 180, -180, 180],
-        zorder=z_ord['base']
-    )
-
-    ax.add_feature(land_50m, linewidth=.8, edgecolor='gray', zorder=z_ord['land'])
-    ax.add_feature(countries_50m, linewidth=.8, edgecolor='gray', zorder=z_ord['land'])
-    ax.add_feature(states_50m, linewidth=.8, edgecolor='gray', zorder=z_ord['states'])
-
-    ax.plot(df['lon'], df['lat'], color='red', marker='o', transform=crs_plt,
-            zorder=z_ord['track'])
+    extent: [ymin, ymax, xmin, xmax] aka [min_lat, max_lat, min_lon, max_lon]
+    """
+    # Nothing to do if the plot would be neither shown nor saved
+    if (not (show or save)):
+        return
 
-    ax.set_extent(plt_extent, crs=crs_plt) # [x0, x1, y0, y1]
+    track_pts = _read_points(shp_path)
 
-    plt.title('NHC Best Track {}-{}'.format(year, storm_name), loc='right', fontsize=12)
+    _plot_track(track_pts[:, 0], track_pts[:, 1], storm_name, year, extent=extent,
+                show=show, save=save, outpath=outpath)
 
-    plt.gca().set_aspect('equal', adjustable='box')
 
-    # Try to cut down on whitespace surrounding the actual plot
-    plt.subplots_adjust(left=0, bottom=0.05, right=1, top=0.95, wspace=0, hspace=0)
 
-    if (save):
-        if (outpath is not None):
-            fname = 'BestTrackPlot.png'
-            path = join(outpath, fname)
-            plt.savefig(path, dpi=600)
-        else:
-            raise ValueError('Error: Outpath cannot be None')
-    if (show):
-        plt.show()
-    plt.close('all')
-    print('--- Track plotted in {0:.4f} seconds ---'.format(time.time() - t_start))
-
-
-
-def plot_raw_track(shp_path, storm_name, year, extent=None, show=True, save=False, outpath=None):
+def _plot_track(lons, lats, storm_name, year, extent=None, show=True, save=False,
+                outpath=None):
     """
+    Plots a best track from its point coordinates. Shared by plot_track_from_df
+    & plot_raw_track
 
     extent: [ymin, ymax, xmin, xmax] aka [min_lat, max_lat, min_lon, max_lon]
     """
@@ -438,7 +722,7 @@ def plot_raw_track(shp_path, storm_name, year, extent=None, show=True, save=Fals
              'top': 10
              }
 
-    crs_plt = ccrs.PlateCarree()
+    crs_plt = _CRS_PC
 
     if (extent):
         plt_extent = [extent[2], extent[3], extent[0], extent[1]]
@@ -446,44 +730,14 @@ def plot_raw_track(shp_path, storm_name, year, extent=None, show=True, save=Fals
         # x0, x1, y0, y1
         plt_extent = [-180, 0, 0, 90]
 
-    shp_reader = shpreader.Reader(shp_path)
-    track_pts = list(shp_reader.geometries())
-    lons = [pt.x for pt in track_pts]
-    lats = [pt.y for pt in track_pts]
+    fig, ax = _build_map_axes(plt_extent, z_ord)
 
-    land_50m = cfeature.NaturalEarthFeature('physical', 'land', '50m', facecolor='none')
-    states_50m = cfeature.NaturalEarthFeature(category='cultural', name='admin_1_states_provinces',
-                                              scale='50m', facecolor='none')
-    countries_50m = cfeature.NaturalEarthFeature(category='cultural', name='admin_0_countries',
-                                                 scale='50m', facecolor='none')
-
-    fig = plt.figure(figsize=(12, 8))
-
-    ax = fig.add_subplot(111, projection=ccrs.Mercator())
-
-    # Set axis background color to black
-    ax.imshow(
-        np.tile(
-            np.array(
-                [[[0, 0, 0]]], dtype=np.uint8),
-            [2, 2, 1]),
-        origin='upper', transform=crs_plt, extent=[-180, 180, -180, 180],
-        zorder=z_ord['base']
-    )
-
-    ax.add_feature(land_50m, linewidth=.8, edgecolor='gray', zorder=z_ord['land'])
-    ax.add_feature(countries_50m, linewidth=.8, edgecolor='gray', zorder=z_ord['land'])
-    ax.add_feature(states_50m, linewidth=.8, edgecolor='gray', zorder=z_ord['states'])
-
-    ax.plot(lons, lats, color='red', marker='o',
-            transform=crs_plt, zorder=z_ord['track'])
+    _draw_track(ax, lons, lats, crs_plt, z_ord['track'])
 
     ax.set_extent(plt_extent, crs=crs_plt) # [x0, x1, y0, y1]
 
     plt.title('NHC Best Track {}-{}'.format(year, storm_name), loc='right', fontsize=12)
 
-    plt.gca().set_aspect('equal', adjustable='box')
-
     # Try to cut down on whitespace surrounding the actual plot
     plt.subplots_adjust(left=0, bottom=0.05, right=1, top=0.95, wspace=0, hspace=0)
 
@@ -501,6 +755,46 @@ def plot_raw_track(shp_path, storm_name, year, extent=None, show=True, save=Fals
 
 
 
+def _build_map_axes(plt_extent, z_ord):
+    """
+    Creates the figure & Mercator map axes the best track is drawn on, with a
+    black background & the land, country, & state features within the extent
+
+    Parameters
+    ----------
+    plt_extent : list of float
+        Format: [min_lon, max_lon, min_lat, max_lat]
+    z_ord : dict
+        Z-order of each plot layer
+
+    Returns
+    -------
+    tuple of (matplotlib Figure, cartopy GeoAxes)
+    """
+    # Only the Natural Earth geometries within the plot extent are added to the
+    # axes, rather than every geometry in each feature
+    scale = _auto_scale(plt_extent)
+    land = _ne_feature_in_extent('physical', 'land', scale, tuple(plt_extent))
+    states = _ne_feature_in_extent('cultural', 'admin_1_states_provinces', scale,
+                                   tuple(plt_extent))
+    countries = _ne_feature_in_extent('cultural', 'admin_0_countries', scale,
+                                      tuple(plt_extent))
+
+    fig = plt.figure(figsize=(12, 8))
+
+    ax = fig.add_subplot(111, projection=_CRS_MERC)
+
+    # Set axis background color to black
+    ax.background_patch.set_facecolor((0, 0, 0))
+
+    ax.add_feature(land, linewidth=.8, edgecolor='gray', zorder=z_ord['land'])
+    ax.add_feature(countries, linewidth=.8, edgecolor='gray', zorder=z_ord['land'])
+    ax.add_feature(states, linewidth=.8, edgecolor='gray', zorder=z_ord['states'])
+
+    return fig, ax
+
+
+
 
 def main():
     # Definitions and whatnot
@@ -521,10 +815,11 @@ def main():
     prnt = False
     pp = True
 
-    meta = get_track_meta(shp_path)
+    track = load_track(shp_path)
+    meta = get_track_meta(track)
     pp_meta(meta)
 
-    # df = track_shp_to_df(shp_path)
+    # df = track_to_df(track)
     # df = interp_df(df, interp_freq)
     #
     # if (prnt):
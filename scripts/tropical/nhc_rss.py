@@ -5,44 +5,76 @@ Functions to retrieve and parse RSS products from the National Hurricane Center
 """
 import feedparser
 import requests
-import re
 import argparse
-import xml.etree.ElementTree as ET
+from functools import lru_cache
+from itertools import repeat
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from lxml import etree
 
+# Max number of concurrent feed downloads made by main
+DL_WORKERS = 4
 
-def loadRSS(url, fname):
 
-    # creating HTTP response object from given url
-    resp = requests.get(url)
+def loadRSS(url, fname, session=None):
 
-    # saving the xml file
-    with open(fname, 'wb') as f:
-        f.write(resp.content)
+    if (session is None):
+        session = _get_session()
+
+    # creating HTTP response object from given url. The body is streamed to
+    # the file in 64 KB chunks rather than being held in memory in full
+    with session.get(url, stream=True, timeout=10) as resp, open(fname, 'wb') as f:
+        for chunk in resp.iter_content(chunk_size=65536):
+            f.write(chunk)
 
     return fname
 
 
 
 def scrub_tags(dirty_str):
-    cleaner = re.compile('<.*?>')
-    clean_text = re.sub(cleaner, '', dirty_str)
+    """
+    Removes the markup tags from a string. The tags are found with str.find
+    rather than a regex. As with the '<.*?>' pattern this replaces, a tag
+    can't span lines & an unclosed '<' is left in place
+    """
+    if ('<' not in dirty_str):
+        return dirty_str
+
+    parts = []
+    pos = 0
+
+    while (True):
+        start = dirty_str.find('<', pos)
+        if (start < 0):
+            break
+
+        end = dirty_str.find('>', start + 1)
+        if (end < 0):
+            break
+
+        if (dirty_str.find('\n', start + 1, end) >= 0):
+            # Not a tag, keep the '<' & look for the next one
+            parts.append(dirty_str[pos:start + 1])
+            pos = start + 1
+        else:
+            parts.append(dirty_str[pos:start])
+            pos = end + 1
+
+    parts.append(dirty_str[pos:])
+    clean_text = ''.join(parts)
+
     return clean_text
 
 
 
 def parseXML(xmlfile):
 
-    # create element tree object
-    tree = ET.parse(xmlfile)
-
-    # get root element
-    root = tree.getroot()
-
     # create empty list for news items
     newsitems = []
 
-    # iterate news items
-    for item in root.findall('./channel/item'):
+    # iterate news items. The items are streamed from the file by lxml's
+    # iterparse & cleared once read, rather than building the whole tree first
+    for _, item in etree.iterparse(xmlfile, tag='item'):
 
         # empty news dictionary
         news = {}
@@ -54,16 +86,81 @@ def parseXML(xmlfile):
             if child.tag == '{http://search.yahoo.com/mrss/}content':
                 news['media'] = child.attrib['url']
             else:
-                news[child.tag] = child.text.encode('utf8')
+                news[child.tag] = child.text or ''
 
         # append news dictionary to news items list
         newsitems.append(news)
+        item.clear()
 
     # return news items list
     return newsitems
 
 
 
+@lru_cache(maxsize=1)
+def _get_session():
+    """
+    Create the requests Session shared by all feed downloads, so that
+    connections to the NHC server (and their TLS handshakes) are reused
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=DL_WORKERS, pool_maxsize=DL_WORKERS)
+    session.mount('https://', adapter)
+
+    return session
+
+
+
+def _handle_feed(key, url, parse=True):
+    """
+    Downloads an NHC feed & reads the scrubbed text of its news items
+
+    Parameters
+    ----------
+    key : str
+        Name of the feed, used in the filename it is saved to
+    url : str
+        URL of the feed
+    parse : bool, optional
+        If False, the feed is only downloaded. Default is True
+
+    Returns
+    -------
+    fname : str
+        Name of the file the feed was saved to
+    items : list of tuple of str
+        Title & description of each news item
+        Format: (title, description)
+    """
+    fname = 'nhc_rss_samp-{}.xml'.format(key)
+    items = []
+
+    loadRSS(url, fname)
+
+    if (not parse):
+        return fname, items
+
+    news = ''
+
+    try:
+        news = parseXML(fname)
+    except:
+        pass
+
+    for x in news:
+
+        curr_title = scrub_tags(x['title'])
+        curr_desc = scrub_tags(x['description'])
+
+        if ((key == 'fcstadv_atl') and (len(curr_title) > 100)):
+            curr_title = ''
+
+        items.append((curr_title, curr_desc))
+
+    return fname, items
+
+
+
 def init_argparser():
     parser = argparse.ArgumentParser()
 
@@ -90,35 +187,27 @@ def main():
             'fsctdisc_atl': 'https://www.nhc.noaa.gov/xml/TCDAT{}.xml'.format(storm_num)
     }
 
-    for key, url in urls.items():
-        fname = 'nhc_rss_samp-{}.xml'.format(key)
-        news = ''
-
-        loadRSS(url, fname)
-
-        try:
-            news = parseXML(fname)
-        except:
-            pass
-
-        for x in news:
+    parse = bool(args.write or args.address)
 
-            curr_title = scrub_tags(x['title'].decode('UTF-8'))
-            curr_desc = scrub_tags(x['description'].decode('UTF-8'))
+    # Each feed is downloaded, parsed & scrubbed in its own thread, sharing
+    # the session's connections. The feeds only need to be parsed if their
+    # text is written or sent
+    with ThreadPoolExecutor(max_workers=DL_WORKERS) as executor:
+        results = list(executor.map(_handle_feed, urls.keys(), urls.values(),
+                                    repeat(parse)))
 
-            if ((key == 'fcstadv_atl') and (len(curr_title) > 100)):
-                curr_title = ''
-
-            if (args.write):
-                f_txt = fname[:-3] + 'txt'
-                with open(f_txt, 'w') as f:
-                    f.write(curr_title)
-                    f.write(curr_desc)
-
-            if (args.address):
+    for fname, items in results:
+        if (args.address):
+            for curr_title, curr_desc in items:
                 print(curr_title)
                 print(curr_desc)
 
+        # Text of every item, written to the feed's text file in one go
+        if (args.write and items):
+            f_txt = fname[:-3] + 'txt'
+            with open(f_txt, 'w') as f:
+                f.write(''.join(title + desc for title, desc in items))
+
 
 
 
@@ -12,6 +12,10 @@ class LocalWtlmaFile(object):
 
     BASE_PATH = '/media/mnichol3/pmeyers1/MattNicholson/wtlma'
 
+    __slots__ = ('filename', 'abs_path', '_start_time', 'coord_center',
+                 'max_diameter', 'active_stations', 'data', '_yr', '_mo',
+                 '_dy', '_hhmm', '_date_prefix')
+
     def __init__(self, abs_path, start_time, coord_center, max_diameter, active_stations):
         super(LocalWtlmaFile, self).__init__()
         self.filename = None
@@ -26,46 +30,51 @@ class LocalWtlmaFile(object):
 
 
 
+    @property
+    def start_time(self):
+        return self._start_time
+
+
+
+    @start_time.setter
+    def start_time(self, start_time):
+        """
+        Sets the start time & splits it into its fields, so they aren't
+        re-split every time a pretty-printed time is requested
+        """
+        self._start_time = start_time
+        self._yr = self._mo = self._dy = self._hhmm = self._date_prefix = None
+        if (start_time is not None):
+            date, time = start_time.split('-')
+            self._yr, self._mo, self._dy = date[:4], date[4:6], date[-2:]
+            self._hhmm = f'{time[:2]}:{time[2:]}'
+            self._date_prefix = f'{self._mo}-{self._dy}-{self._yr}'
+
+
+
     def _set_data(self, data):
         self.data = data
 
 
 
     def _parse_fname(self, abs_path):
-        _, self.filename = split(abs_path)
+        _, fname = split(abs_path)
+        return fname
 
 
 
     def _start_time_pp(self):
-        date, time = self.start_time.split('-')
-        time = time[:2] + ':' + time[2:]
-        year = date[:4]
-        month = date[4:6]
-        day = date[-2:]
-        pp = month + '-' + day + '-' + year + ' ' + time
-        return pp
+        return f'{self._date_prefix} {self._hhmm}'
 
 
 
     def _data_start_pp(self):
-        date, _ = self.start_time.split('-')
-        year = date[:4]
-        month = date[4:6]
-        day = date[-2:]
-        time = self.data['time'].iloc[0]
-        pp = month + '-' + day + '-' + year + ' ' + time
-        return pp
+        return f"{self._date_prefix} {self.data['time'].iat[0]}"
 
 
 
     def _data_end_pp(self):
-        date, _ = self.start_time.split('-')
-        year = date[:4]
-        month = date[4:6]
-        day = date[-2:]
-        time = self.data['time'].iloc[-1]
-        pp = month + '-' + day + '-' + year + ' ' + time
-        return pp
+        return f"{self._date_prefix} {self.data['time'].iat[-1]}"
 
 
     def __repr__(self):
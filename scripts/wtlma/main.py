@@ -6,11 +6,10 @@ if (__name__ == '__main__'):
     flash_df = ingest()
     print_stats(flash_df)
 
-    area = flash_df['area'].tolist()
-    duration = flash_df['duration'].tolist()
-    duration = [x*1000 for x in duration] # convert from seconds to miliseconds
+    area = flash_df['area'].to_numpy(copy=False)
+    duration = flash_df['duration'].to_numpy(copy=False) * 1000.0 # convert from seconds to miliseconds
 
-    altitude = flash_df['ctr_alt'].tolist()
+    altitude = flash_df['ctr_alt'].to_numpy(copy=False)
 
     # plot_hist_area(area, altitude, save=True, show=False)
     # plot_hist_dur(duration, altitude, save=True, show=False)
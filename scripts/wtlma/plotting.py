@@ -4,6 +4,10 @@ import matplotlib.colors as mcolors
 import matplotlib.cm as cm
 import numpy as np
 
+# Flash arrays longer than this are binned in blocks of HIST_BLOCK elements
+HIST_BLOCK_THRESH = 1000000
+HIST_BLOCK = 65536
+
 def plot_hist_area(x, y, save=False, show=True):
     """
     data: dict
@@ -14,14 +18,12 @@ def plot_hist_area(x, y, save=False, show=True):
     xbins = np.linspace(0, 50, 100)
     ybins = np.linspace(0, 20000, 100)
 
-    hist = plt.hist2d(x, y, bins=(xbins, ybins),
-               range=[[1, 50], [0, 20000]], norm=mcolors.PowerNorm(0.5),
-               cmap=cm.hot)
+    mesh = _hist2d_mesh(ax, x, y, xbins, ybins, [[1, 50], [0, 20000]])
 
     plt.xlabel('Flash Area (km^2)')
     plt.ylabel('Flash Altitude (m)')
     # plt.title('WTLMA Flash Area vs. Altitude for 05-23-2019 2050-2200z')
-    plt.colorbar(hist[3], ax=ax)
+    plt.colorbar(mesh, ax=ax)
     plt.tight_layout()
 
     if (save):
@@ -41,14 +43,12 @@ def plot_hist_dur(x, y, save=False, show=True):
     xbins = np.linspace(0, 500, 100)
     ybins = np.linspace(0, 20000, 100)
 
-    hist = plt.hist2d(x, y, bins=(xbins, ybins),
-               range=[[0, 500], [0, 20000]], norm=mcolors.PowerNorm(0.5),
-               cmap=cm.hot)
+    mesh = _hist2d_mesh(ax, x, y, xbins, ybins, [[0, 500], [0, 20000]])
 
     plt.xlabel('Flash Duration (ms)')
     plt.ylabel('Flash Altitude (m)')
     # plt.title('WTLMA Flash Area vs. Altitude for 05-23-2019 2050-2200z')
-    plt.colorbar(hist[3], ax=ax)
+    plt.colorbar(mesh, ax=ax)
     plt.tight_layout()
 
     if (save):
@@ -71,3 +71,71 @@ def plot_hist_dur_basic(duration, save=False, show=True):
         plt.savefig('05232019-FlashDurationHist.png', dpi=300)
     if (show):
         plt.show()
+
+
+
+def _hist2d_mesh(ax, x, y, xbins, ybins, hist_range):
+    """
+    Bins the data with np.histogram2d & draws the counts with pcolormesh. The
+    numpy arrays are binned directly, rather than going through plt.hist2d
+
+    Parameters
+    ----------
+    ax : matplotlib Axes
+    x : numpy 1d array
+    y : numpy 1d array
+    xbins : numpy 1d array
+        x bin edges
+    ybins : numpy 1d array
+        y bin edges
+    hist_range : list of list of float
+        Format: [[xmin, xmax], [ymin, ymax]]
+
+    Returns
+    -------
+    matplotlib QuadMesh
+    """
+    x = np.asarray(x)
+    y = np.asarray(y)
+
+    if (len(x) > HIST_BLOCK_THRESH):
+        counts = _hist2d_blocked(x, y, xbins, ybins, hist_range)
+        xedges, yedges = xbins, ybins
+    else:
+        counts, xedges, yedges = np.histogram2d(x, y, bins=(xbins, ybins), range=hist_range)
+
+    return ax.pcolormesh(xedges, yedges, counts.T, norm=mcolors.PowerNorm(0.5),
+                         cmap=cm.hot)
+
+
+
+def _hist2d_blocked(x, y, xbins, ybins, hist_range, block=HIST_BLOCK):
+    """
+    Computes a 2D histogram block by block, so the working set of each
+    np.histogram2d call stays small for very long flash arrays. The counts are
+    the same as those of a single np.histogram2d call over the whole arrays
+
+    Parameters
+    ----------
+    x : numpy 1d array
+    y : numpy 1d array
+    xbins : numpy 1d array
+        x bin edges
+    ybins : numpy 1d array
+        y bin edges
+    hist_range : list of list of float
+        Format: [[xmin, xmax], [ymin, ymax]]
+    block : int, optional
+        Number of elements binned per block. Default is HIST_BLOCK
+
+    Returns
+    -------
+    counts : numpy 2d array of float
+    """
+    counts = np.zeros((len(xbins) - 1, len(ybins) - 1))
+
+    for i in range(0, len(x), block):
+        counts += np.histogram2d(x[i:i + block], y[i:i + block], bins=(xbins, ybins),
+                                 range=hist_range)[0]
+
+    return counts
@@ -1,8 +1,10 @@
 
-from os.path import join
+from os import replace
+from os.path import join, isfile, getmtime
 import pandas as pd
 from sys import exit
 
+FLASH_CACHE = 'flash_cache.pkl'
 
 def ingest():
     """
@@ -19,55 +21,59 @@ def ingest():
                    'flash-out-05232019-2140.txt',
                    'flash-out-05232019-2150.txt']
 
+    flash_paths = [join(base_path, f) for f in flash_files]
+
+    # The combined DataFrame is cached next to the flash files, along with the
+    # paths of the files it was built from. It's reused until one of the flash
+    # files is modified or the list of flash files changes
+    cache_path = join(base_path, FLASH_CACHE)
+    if (isfile(cache_path) and getmtime(cache_path) >= max(getmtime(f) for f in flash_paths)):
+        cached_paths, cached_df = pd.read_pickle(cache_path)
+        if (cached_paths == flash_paths):
+            return cached_df
+
     df_cols = ['start', 'end', 'duration', 'area', 'ctr_alt', 'ctr_lat', 'ctr_lon',
                'tot_energy']
 
-    flash_df = pd.read_csv(join(base_path, flash_files[0]), sep=',', names=df_cols)
+    # float32 holds the precision of the flash files. The files are read into a
+    # list & stitched together with a single concat, rather than re-copying
+    # the accumulated frame for every file
+    df_dtypes = {'area': 'float32', 'ctr_alt': 'float32', 'duration': 'float32',
+                 'tot_energy': 'float32', 'ctr_lat': 'float32', 'ctr_lon': 'float32'}
+
+    frames = [pd.read_csv(f, sep=',', names=df_cols, dtype=df_dtypes)
+              for f in flash_paths]
+
+    flash_df = pd.concat(frames, ignore_index=True)
 
-    for f in flash_files[1:]:
-        curr_path = join(base_path, f)
-        curr_df = pd.read_csv(curr_path, sep=',', names=df_cols)
-        flash_df = pd.concat([flash_df, curr_df], ignore_index=True)
+    # Written to a temporary file first, so a partially written cache is never
+    # read. If the directory can't be written to the files are just re-read
+    # next time
+    try:
+        pd.to_pickle((flash_paths, flash_df), cache_path + '.tmp')
+        replace(cache_path + '.tmp', cache_path)
+    except OSError:
+        pass
 
     return flash_df
 
 
 
 def print_stats(df):
-    area_list = df['area'].tolist()
-    print('Flash area (km^2):')
-    print('     min: {}'.format(min(area_list)))
-    print('     max: {}'.format(max(area_list)))
-    print('     avg: {}\n'.format(sum(area_list)/len(area_list)))
-
-    energy_list = df['tot_energy']
-    print('Total flash energy:')
-    print('     min: {}'.format(min(energy_list)))
-    print('     max: {}'.format(max(energy_list)))
-    print('     avg: {}\n'.format(sum(energy_list)/len(energy_list)))
-
-    duration_list = df['duration']
-    print('Flash duration (s):')
-    print('     min: {}'.format(min(duration_list)))
-    print('     max: {}'.format(max(duration_list)))
-    print('     avg: {}\n'.format(sum(duration_list)/len(duration_list)))
-
-    alt_list = df['ctr_alt']
-    print('Flash altitude (m):')
-    print('     min: {}'.format(min(alt_list)))
-    print('     max: {}'.format(max(alt_list)))
-    print('     avg: {}\n'.format(sum(alt_list)/len(alt_list)))
-
-    lat_list = df['ctr_lat']
-    print('Flash lats:')
-    print('     min: {}'.format(min(lat_list)))
-    print('     max: {}'.format(max(lat_list)))
-    print('     avg: {}\n'.format(sum(lat_list)/len(lat_list)))
-
-    lon_list = df['ctr_lon']
-    print('Flash lons:')
-    print('     min: {}'.format(min(lon_list)))
-    print('     max: {}'.format(max(lon_list)))
-    print('     avg: {}\n'.format(sum(lon_list)/len(lon_list)))
+    # Column & label of each statistic block, in print order
+    stat_cols = [('area', 'Flash area (km^2)'),
+                 ('tot_energy', 'Total flash energy'),
+                 ('duration', 'Flash duration (s)'),
+                 ('ctr_alt', 'Flash altitude (m)'),
+                 ('ctr_lat', 'Flash lats'),
+                 ('ctr_lon', 'Flash lons')]
+
+    stats = df[[col for col, _ in stat_cols]].agg(['min', 'max', 'mean'])
+
+    for col, label in stat_cols:
+        print('{}:'.format(label))
+        print('     min: {}'.format(stats.at['min', col]))
+        print('     max: {}'.format(stats.at['max', col]))
+        print('     avg: {}\n'.format(stats.at['mean', col]))
 
     print('Number of flashes: {}'.format(df.shape[0]))
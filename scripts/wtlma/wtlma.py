@@ -17,14 +17,26 @@ get_files_in_range(base_path, '5-20-2019-21:15', '5-21-2019-22:15', write=True)
 """
 import pandas as pd
 import numpy as np
-from os.path import join, isdir, isfile
-from os import listdir
+from os.path import join, isfile
+from os import scandir
 import re
 from datetime import datetime, timedelta
-from math import sin, cos, sqrt, atan2, radians, degrees
+from functools import lru_cache
+from math import sqrt, atan2, radians
+from pyproj import Geod
 
 from localwtlmafile import LocalWtlmaFile
 
+EARTH_RADIUS_M = 6373000.0  # Approx. radius of Earth, in meters
+
+# Pattern for the network center coordinates in the WTLMA file header. The
+# lat, lon & alt are matched in a single pass over the line
+CENTER_RE = re.compile(r'\s(?P<lat>\d{2}\.\d{5,10}).*?\s(?P<lon>\D\d{3}\.\d{5,10})'
+                       r'.*?\s(?P<alt>\d{1,3}.{1,3})$')
+MAX_DIAM_RE = re.compile(r'\s(\d{1,3}.{1,3})$')
+
+# Zero-padded month & day strings, indexed by value
+_ZPAD2 = ['{:02}'.format(x) for x in range(32)]
 
 
 
@@ -42,51 +54,65 @@ def parse_file(abs_path, sub_t=None):
     -------
     new_file_obj : LocalWtlmaFile object
     """
-    center_lat_re = re.compile(r'\s(\d{2}\.\d{5,10})')
-    center_lon_re = re.compile(r'\s(\D\d{3}\.\d{5,10})')
-    center_alt_re = re.compile(r'\s(\d{1,3}.{1,3})$')   # can also be used as the range re
     coord_center = None
     max_diameter = None
 
     #abs_path = join(BASE_PATH, fname)
 
-    with open(abs_path) as f:
-        head = [next(f).rstrip() for x in range(46)]    # rstrip() removes trailing \n
+    col_names = ['time', 'lat', 'lon', 'alt', 'r chi2', 'P', 'mask']
+
+    # The header & the data are read through the same handle, so the file is
+    # only opened & read once
+    with open(abs_path, 'rb') as f:
+        head = [f.readline().decode().rstrip() for x in range(46)]    # rstrip() removes trailing \n
+
+        # Skip the rest of the header
+        for x in range(3):
+            f.readline()
+
+        # A plain whitespace separator lets pandas use its C parser rather than
+        # the regex-driven python engine. float32 holds the LMA's precision, &
+        # the hex station masks only take a handful of distinct values
+        data_df = pd.read_csv(f, sep=r'\s+', names=col_names, engine='c',
+                              dtype={'time': np.float64, 'lat': np.float32,
+                                     'lon': np.float32, 'alt': np.float32,
+                                     'r chi2': np.float32, 'P': np.float32,
+                                     'mask': 'category'})
 
     dt = datetime.strptime(head[5][17:], '%m/%d/%y %H:%M:%S')
     start_time = dt.strftime('%Y%m%d-%H%M')
 
-    match1 = center_lat_re.search(head[8])
-    if (match1):
-        match2 = center_lon_re.search(head[8])
-        if (match2):
-            match3 = center_alt_re.search(head[8])
-            if (match3):
-                coord_center = (match1.group(1), match2.group(1), match3.group(1))
+    match = CENTER_RE.search(head[8])
+    if (match):
+        coord_center = match.group('lat', 'lon', 'alt')
 
-    match = center_alt_re.search(head[9])
+    match = MAX_DIAM_RE.search(head[9])
     if (match):
         max_diameter = match.group(1)
 
 
     active_stations = head[12].rsplit(' ', 1)[-1]
-    col_names = ['time', 'lat', 'lon', 'alt', 'r chi2', 'P', 'mask']
-    data_df = pd.read_csv(abs_path, sep=r'\s{1,7}', names=col_names, skiprows=49, engine='python')
 
-    # Convert event times from seconds of day to HH:MM:SS
-    data_df['time'] = data_df['time'].apply(_sec_to_datetime_str)
+    # The time subset & r chi2 filters are applied to the seconds of day, so
+    # only the events that are kept get converted to HH:MM
+    if (sub_t):
+        if (len(sub_t) != 5):
+            raise ValueError('Invalid time subset argument')
+
+        sub_min = int(sub_t[:2]) * 60 + int(sub_t[3:])
+        secs = data_df['time'].to_numpy()
+
+        keep = ((secs // 60) % 1440 == sub_min) & (data_df['r chi2'].to_numpy() <= 1)
+        data_df = data_df[keep].copy()
+
+    # Convert event times from seconds of day to HH:MM
+    data_df['time'] = _secs_to_hhmm(data_df['time'].to_numpy())
 
     new_file_obj = LocalWtlmaFile(abs_path, start_time, coord_center, max_diameter, active_stations)
+    new_file_obj._set_data(data_df)
 
     if (sub_t):
-        if (len(sub_t) != 5):
-            raise ValueError('Invalid time subset argument')
-        else:
-            subs_df = data_df.loc[lambda data_df: ((data_df['time'] == sub_t) & (data_df['r chi2'] <= 1))]
-            new_file_obj._set_data(subs_df)
-            new_file_obj.start_time = new_file_obj.start_time.split('-')[0] + '-' + sub_t[:2] + sub_t[3:]
-    else:
-        new_file_obj._set_data(data_df)
+        new_file_obj.start_time = new_file_obj.start_time.split('-')[0] + '-' + sub_t[:2] + sub_t[3:]
 
     return new_file_obj
 
@@ -112,7 +138,7 @@ def get_avail_months(base_path, year):
 
     abs_path = join(base_path, year)
 
-    return [dir for dir in listdir(abs_path) if isdir(join(abs_path, dir))]
+    return _list_dirs(abs_path)
 
 
 
@@ -140,7 +166,7 @@ def get_avail_days(base_path, year, month):
 
     abs_path = join(base_path, year, month)
 
-    return [dir for dir in listdir(abs_path) if isdir(join(abs_path, dir))]
+    return _list_dirs(abs_path)
 
 
 
@@ -172,7 +198,7 @@ def get_avail_hours(base_path, year, month, day):
 
     abs_path = join(base_path, year, month, day)
 
-    files = [f for f in listdir(abs_path) if isfile(join(abs_path, f))]
+    files = _list_files(abs_path)
     for f in files:
         curr = f[14:16]
         if (curr not in hours and _is_number(curr)):
@@ -217,12 +243,11 @@ def get_files_day(base_path, date):
 
     abs_path = join(base_path, year, month, day)
 
-    if (hour):
-        dt_str = date.strftime('%y%m%d_%H')
-        time_re = re.compile(r'LYLOUT_' + dt_str)
-        files = [f for f in listdir(abs_path) if isfile(join(abs_path, f)) and f[-4:]=='.dat' and time_re.match(f)]
+    if (hour is not None):
+        prefix = 'LYLOUT_' + date.strftime('%y%m%d_%H')
+        files = [f for f in _list_files(abs_path) if f.endswith('.dat') and f.startswith(prefix)]
     else:
-        files = [f for f in listdir(abs_path) if isfile(join(abs_path, f)) and f[-4:]=='.dat']
+        files = [f for f in _list_files(abs_path) if f.endswith('.dat')]
 
     return files
 
@@ -257,12 +282,18 @@ def get_files_in_range(base_path, start, end, write=False):
     start_dt = datetime.strptime(start, '%m-%d-%Y-%H:%M')
     end_dt = datetime.strptime(end, '%m-%d-%Y-%H:%M')
 
-    for dt in _datetime_range(start_dt, end_dt):
-        time = dt.strftime('%m-%d-%Y-%H')
-        files = get_files_day(base_path, time)
+    # Files are only written every 10 minutes, so step through the range on
+    # that grid rather than minute by minute
+    step = timedelta(minutes=10)
+    dt = start_dt.replace(minute=_round_down(start_dt.minute, 10), second=0)
+
+    # The name of the file expected at each step is known, so its path is
+    # checked directly rather than listing its directory
+    while (dt <= end_dt):
         curr_fname = _build_fname(dt)
-        if (curr_fname in files and curr_fname not in result):
+        if (isfile(_parse_abs_path(base_path, curr_fname))):
             result.append(curr_fname)
+        dt += step
     if (write):
         f_start = start_dt.strftime('%y%m%d-%H%M')
         f_end = end_dt.strftime('%y%m%d-%H%M')
@@ -308,28 +339,37 @@ def filter_by_dist(lma_df, dist, start_point, end_point, num_pts):
     if (not isinstance(dist, int)):
         raise TypeError('dist must be of type int')
 
-    s_lat = start_point[0]
-    s_lon = start_point[1]
-    e_lat = end_point[0]
-    e_lon = end_point[1]
-
-    idxs = []
-    coords = []
-    alts = lma_df['alt'].tolist()
-    xsect_az = int(calc_bearing(start_point, end_point))
-
-    for pt1 in calc_geod_pts(start_point, end_point, num_pts=num_pts):
-        for idx, pt2 in enumerate(list(zip(lma_df['lat'].tolist(), lma_df['lon'].tolist()))):
-            # reverse the order of pt1 since the function returns the coordinates
-            # as (lon, lat) and calc_dist wants (lat, lon)
-            curr_az = int(calc_bearing((pt1[1], pt1[0]), pt2))
-            if ((calc_dist((pt1[1], pt1[0]), pt2, units='m') <= dist) and (idx not in idxs) and (alts[idx] < 19000)):
-                idxs.append(idx)
-                coords.append([pt1[1], pt1[0]])
-
-    # Remove repeat indexes from list
-    # MUCH faster to use a set than another conditional inside the nested loops
-    #idxs = list(set(idxs))
+    # Points along the cross section line, format: (lon, lat)
+    pts = calc_geod_pts(start_point, end_point, num_pts=num_pts)
+    # The columns are read as views of the DataFrame's arrays. The conversion to
+    # float64 radians is the only copy made of them
+    ev_lats = np.radians(lma_df['lat'].to_numpy(copy=False), dtype=np.float64)
+    ev_lons = np.radians(lma_df['lon'].to_numpy(copy=False), dtype=np.float64)
+
+    # The distance increases monotonically with the haversine term, so rather
+    # than converting every term to a distance the threshold is converted to a
+    # term
+    a_max = np.sin(dist / (2 * EARTH_RADIUS_M))**2
+
+    # Indices of the events below 19 km that haven't been matched to a point yet.
+    # Once an event is within dist of a point it is dropped from the search, so
+    # each point only tests the events that are still unmatched
+    pending = np.flatnonzero(lma_df['alt'].to_numpy(copy=False) < 19000)
+    first_pt = np.full(len(lma_df), -1, dtype=np.intp)
+
+    for pt_idx, (pt_lon, pt_lat) in enumerate(np.radians(pts)):
+        if (pending.size == 0):
+            break
+
+        hits = (_haversine_term(pt_lat, pt_lon, ev_lats[pending], ev_lons[pending]) <= a_max)
+        first_pt[pending[hits]] = pt_idx
+        pending = pending[~hits]
+
+    idxs = np.flatnonzero(first_pt >= 0)
+
+    # Each event is paired with the first point on the line within dist of it
+    coords = pts[first_pt[idxs]][:, ::-1].tolist()
+
     subs_df = lma_df.iloc[idxs]
 
     return subs_df, coords
@@ -352,17 +392,10 @@ def calc_dist(point1, point2, units='km'):
     units : str, optional
         If units = m, the distance will be returned in meters instead of kilometers
     """
-    R = 6373.0  # Approx. radius of Earth, in km
-
-    lat1 = radians(point1[0])
-    lon1 = radians(point1[1])
-    lat2 = radians(point2[0])
-    lon2 = radians(point2[1])
+    R = EARTH_RADIUS_M / 1000   # Approx. radius of Earth, in km
 
-    dlon = lon2 - lon1
-    dlat = lat2 - lat1
-
-    a = sin(dlat / 2)**2 + cos(lat1) * cos(lat2) * sin(dlon / 2)**2
+    a = _haversine_term(radians(point1[0]), radians(point1[1]),
+                        radians(point2[0]), radians(point2[1]))
     c = 2 * atan2(sqrt(a), sqrt(1 - a))
 
     distance = R * c
@@ -374,6 +407,20 @@ def calc_dist(point1, point2, units='km'):
 
 
 
+def _haversine_term(lat1, lon1, lat2, lon2):
+    """
+    Computes the haversine of the central angle between two points, given in
+    radians. Works on scalars & on (broadcastable) numpy arrays alike
+
+    Returns
+    -------
+    a : float or numpy nd array of float
+        The distance between the points is 2 * R * atan2(sqrt(a), sqrt(1 - a))
+    """
+    return np.sin((lat2 - lat1) / 2)**2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2)**2
+
+
+
 def calc_geod_pts(point1, point2, num_pts):
     """
     Calculates a number of points, num_pts, along a line defined by point1 & point2
@@ -391,119 +438,132 @@ def calc_geod_pts(point1, point2, num_pts):
 
     Returns
     -------
-    Yields a tuple of floats
-    Format: (lon, lat)
+    numpy 2d array of float, shape (num_pts, 2)
+        Format: (lon, lat)
     """
     geod = Geod("+ellps=WGS84")
     points = geod.npts(lon1=point1[1], lat1=point1[0], lon2=point2[1],
                    lat2=point2[0], npts=num_pts)
 
-    for pt in points:
-        yield pt
+    return np.asarray(points, dtype=np.float64).reshape(-1, 2)
 
 
 
 def calc_bearing(point1, point2):
     """
-    Calculates the bearing between two points
+    Calculates the bearing between two points. The coordinates may also be
+    numpy arrays, in which case the bearings between each pair of points are
+    computed at once
 
     https://gist.github.com/jeromer/2005586
 
     Parameters
     ----------
-    point1 : tuple of floats
+    point1 : tuple of floats or of numpy arrays
         Format: (lat, lon)
-    point2 : tuple of floats
+    point2 : tuple of floats or of numpy arrays
         Format: (lat, lon)
 
     Returns
     -------
-    bearing : float
+    bearing : float or numpy array of float
     """
 
-    lat1 = radians(point1[0])
-    lat2 = radians(point2[0])
+    lat1 = np.radians(point1[0])
+    lat2 = np.radians(point2[0])
 
-    diffLong = radians(point2[1] - point1[1])
+    diffLong = np.radians(np.subtract(point2[1], point1[1]))
 
-    x = sin(diffLong) * cos(lat2)
-    y = math.cos(lat1) * sin(lat2) - (sin(lat1)
-            * cos(lat2) * cos(diffLong))
+    x = np.sin(diffLong) * np.cos(lat2)
+    y = np.cos(lat1) * np.sin(lat2) - (np.sin(lat1)
+            * np.cos(lat2) * np.cos(diffLong))
 
-    initial_bearing = atan2(x, y)
+    initial_bearing = np.arctan2(x, y)
 
-    # Now we have the initial bearing but math.atan2 return values
+    # Now we have the initial bearing but arctan2 return values
     # from -180° to + 180° which is not what we want for a compass bearing
     # The solution is to normalize the initial bearing as shown below
-    initial_bearing = degrees(initial_bearing)
+    initial_bearing = np.degrees(initial_bearing)
     bearing = (initial_bearing + 360) % 360
     return bearing
 
 
 
 def bearing_diff(bearing1, bearing2):
-    diff = abs(bearing1 - bearing2)
-    if (diff > 360):
-        diff = abs(360 - diff)
-    if (diff > 180):
-        diff = abs(360 - diff)
-    return diff
+    """
+    Calculates the smallest angle between two bearings, in degrees. The
+    bearings may also be numpy arrays
+
+    Parameters
+    ----------
+    bearing1 : float or numpy array of float
+    bearing2 : float or numpy array of float
+
+    Returns
+    -------
+    diff : float or numpy array of float
+        Between 0 & 180
+    """
+    diff = np.abs(np.subtract(bearing1, bearing2)) % 360.0
+    return np.minimum(diff, 360.0 - diff)
 
 
 
 def _year_formatter(year):
-    if (isinstance(year, int)):
-        return '{}'.format(year)
-    elif (isinstance(month, str)):
-        return '{}'.format(year)
-    else:
-        raise TypeError('Year must be of type int or str')
+    return str(year)
 
 
 
 def _month_formatter(month):
-    if (isinstance(month, int)):
-        return '{:02}'.format(month)
-    elif (isinstance(month, str)):
-        return '{}'.format(month).zfill(2)
-    else:
-        raise TypeError('Month must be of type int or str')
+    return _ZPAD2[int(month)]
 
 
 
 def _day_formatter(day):
-    if (isinstance(day, int)):
-        return '{:02}'.format(day)
-    elif (isinstance(day, str)):
-        return '{}'.format(day).zfill(2)
-    else:
-        raise TypeError('Day must be of type int or str')
+    return _ZPAD2[int(day)]
 
 
 
-def _is_number(s):
-    try:
-        int(s)
-        return True
-    except ValueError:
-        return False
+def _list_dirs(abs_path):
+    """
+    Lists the names of the subdirectories of a directory. scandir gets each
+    entry's type along with its name, so no entry needs a separate stat call
+    """
+    with scandir(abs_path) as entries:
+        return [entry.name for entry in entries if entry.is_dir()]
 
 
 
-def _datetime_range(start, end):
+def _list_files(abs_path):
+    """
+    Lists the names of the files in a directory. scandir gets each entry's type
+    along with its name, so no entry needs a separate stat call
+    """
+    with scandir(abs_path) as entries:
+        return [entry.name for entry in entries if entry.is_file()]
 
-    diff = (end + timedelta(minutes = 1)) - start
 
-    for x in range(int(diff.total_seconds() / 60)):
-        yield start + timedelta(minutes = x)
+
+def _is_number(s):
+    return s.isdigit()
 
 
 
 def _build_fname(date_time):
-    date_time = date_time.replace(minute=_round_down(date_time.minute, 10))
-    dt_str = date_time.strftime('%y%m%d_%H%M')
-    fname = 'LYLOUT_' + dt_str + '00_0600.dat'
-    return fname
+    return _fname_from_fields(date_time.year, date_time.month, date_time.day,
+                              date_time.hour, _round_down(date_time.minute, 10))
+
+
+
+@lru_cache(maxsize=None)
+def _fname_from_fields(year, month, day, hour, minute):
+    """
+    Formats a WTLMA filename from the fields of its start time. Files start
+    every 10 minutes, so there are only 144 distinct names per day & repeated
+    names are returned from the cache
+    """
+    return 'LYLOUT_{:02d}{:02d}{:02d}_{:02d}{:02d}00_0600.dat'.format(year % 100, month,
+                                                                     day, hour, minute)
 
 
 
@@ -526,13 +586,23 @@ def _round_down(num, divisor):
 
 
 
-def _sec_to_datetime_str(secs):
-    td = timedelta(seconds=int(secs))
-    d = {'days': td.days}
-    d['hours'], rem = divmod(td.seconds, 3600)
-    d['mins'], d['secs'] = divmod(rem, 60)
+def _secs_to_hhmm(secs):
+    """
+    Converts an array of seconds of day to HH:MM strings. A file only spans a
+    handful of distinct minutes, so only those are formatted & the result is
+    a Categorical holding an integer code per event rather than a string
+
+    Parameters
+    ----------
+    secs : numpy 1d array of float
+
+    Returns
+    -------
+    pandas Categorical of str
+    """
+    mins = (secs // 60).astype(np.int64) % 1440
+    uniq_mins, inverse = np.unique(mins, return_inverse=True)
 
-    for key, val in d.items():
-        d[key] = '{0:02d}'.format(val)
+    labels = ['{:02d}:{:02d}'.format(*divmod(m, 60)) for m in uniq_mins]
 
-    return d['hours'] + ':' + d['mins'] #+ ':' + d['secs']
+    return pd.Categorical.from_codes(inverse.ravel(), labels)